@@ -4,26 +4,28 @@ Main API module for the Anki Deck Generator.
 This module provides the primary interface for creating and managing Anki decks.
 """
 
+from typing import BinaryIO, Iterable, Optional, Tuple
+
 from .config import LanguageConfig, GERMAN
 from .deck_manager import DeckManager
 
+_APKG = ".apkg"
+
 
 class AnkiGenerator:
     """Main API class for generating Anki decks.
     
-    This class provides a simple interface for creating vocabulary and grammar
-    decks for language learning.
+    This class provides a simple interface for creating Q&A decks
+    (e.g., German::Vocabulary, German::Grammar) for language learning.
     
     Example usage:
         >>> from anki_generator import AnkiGenerator, GERMAN
         >>> gen = AnkiGenerator(GERMAN)
-        >>> gen.create_vocabulary_chapter("ChapterA")
-        >>> gen.add_vocabulary_card(
-        ...     chapter="ChapterA",
-        ...     word="Haus",
-        ...     word_translation="house",
-        ...     sentence="Das Haus ist groß.",
-        ...     sentence_translation="The house is big."
+        >>> gen.create_qa_deck("Vocabulary")
+        >>> gen.add_qa_card(
+        ...     deck_type="Vocabulary",
+        ...     question="das Haus",
+        ...     answer="house"
         ... )
         >>> gen.export("german_deck.apkg")
     """
@@ -35,7 +37,14 @@ class AnkiGenerator:
             config: The language configuration to use. Defaults to GERMAN.
         """
         self.config = config
-        self._deck_manager = DeckManager(config)
+        self._manager: Optional[DeckManager] = None
+    
+    @property
+    def _deck_manager(self) -> DeckManager:
+        """Lazy initialization of the deck manager (only when decks are used)."""
+        if self._manager is None:
+            self._manager = DeckManager(self.config)
+        return self._manager
     
     def create_qa_deck(self, deck_type: str) -> None:
         """Create a Q&A deck.
@@ -51,6 +60,8 @@ class AnkiGenerator:
     def add_qa_card(self, deck_type: str, question: str, answer: str) -> None:
         """Add a Q&A card to a specific deck type.
         
+        Adding the same question and answer to a deck type twice is a no-op.
+        
         Args:
             deck_type: The deck type name (e.g., "Grammar", "Radicals").
             question: The question or prompt.
@@ -58,6 +69,18 @@ class AnkiGenerator:
         """
         self._deck_manager.add_qa_card(deck_type, question, answer)
     
+    def extend_qa_cards(self, deck_type: str, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Add many Q&A cards to a specific deck type at once.
+        
+        Args:
+            deck_type: The deck type name (e.g., "Grammar", "Radicals").
+            pairs: (question, answer) pairs to add.
+        
+        Returns:
+            The number of cards added. Pairs already in the deck are skipped.
+        """
+        return self._deck_manager.extend_qa_cards(deck_type, pairs)
+    
     def export(self, filename: str = "output.apkg") -> str:
         """Export all decks to an Anki package file.
         
@@ -68,12 +91,25 @@ class AnkiGenerator:
         Returns:
             The filename that was written to.
         """
-        if not filename.endswith(".apkg"):
-            filename = f"{filename}.apkg"
+        if not filename.endswith(_APKG):
+            filename += _APKG
         
         self._deck_manager.export(filename)
         return filename
     
+    def export_to_fileobj(self, fileobj: BinaryIO) -> None:
+        """Export all decks as an Anki package into a binary file object.
+        
+        Useful for uploading or streaming the package without a temporary
+        file on disk.
+        
+        Args:
+            fileobj: A writable binary file object (e.g., io.BytesIO or an
+                upload stream). It does not need to be seekable and is not
+                closed.
+        """
+        self._deck_manager.export_to_fileobj(fileobj)
+    
     @property
     def language(self) -> str:
         """Get the name of the language being learned.
@@ -5,8 +5,14 @@ This module defines language configurations that can be used with the Anki Gener
 To add a new language, simply create a new LanguageConfig instance.
 """
 
+import functools
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .ids import stable_id
+
+if TYPE_CHECKING:
+    import genanki
 
 
 @dataclass
@@ -18,13 +24,21 @@ class LanguageConfig:
         native_code: The TTS language code for the native language (e.g., "de_DE")
         translation_language: The name of the translation language (e.g., "English")
         translation_code: The TTS language code for the translation language (e.g., "en_US")
-        deck_types: List of Q&A deck type names (e.g., ["Grammar"], ["Radicals"])
+        deck_types: Q&A deck type names (e.g., ["Grammar"], ["Radicals"]). Stored as
+            a tuple so the derived lookups below cannot go stale.
     """
     name: str
     native_code: str
     translation_language: str
     translation_code: str
-    deck_types: List[str] = field(default_factory=lambda: ["Vocabulary", "Grammar"])
+    deck_types: Tuple[str, ...] = field(default_factory=lambda: ("Vocabulary", "Grammar"))
+    
+    def __post_init__(self):
+        self.deck_types = tuple(self.deck_types)
+        # Deck names and IDs never change for a config, so build them once
+        self._qa_names: Dict[str, str] = {dt: f"{self.name}::{dt}" for dt in self.deck_types}
+        self._qa_ids: Dict[str, int] = {dt: stable_id(n) for dt, n in self._qa_names.items()}
+        self._deck_type_index: Dict[str, str] = {dt.lower(): dt for dt in self.deck_types}
     
     @property
     def deck_prefix(self) -> str:
@@ -33,19 +47,37 @@ class LanguageConfig:
     
     def qa_deck_name(self, deck_type: str) -> str:
         """Returns the Q&A deck name for a given type (e.g., 'German::Grammar')."""
-        return f"{self.name}::{deck_type}"
+        name = self._qa_names.get(deck_type)
+        if name is None:
+            return f"{self.name}::{deck_type}"
+        return name
+    
+    def qa_deck_id(self, deck_type: str) -> int:
+        """Returns the stable Anki deck ID for a given Q&A deck type."""
+        deck_id = self._qa_ids.get(deck_type)
+        if deck_id is None:
+            return stable_id(self.qa_deck_name(deck_type))
+        return deck_id
+    
+    @functools.cached_property
+    def qa_models(self) -> Dict[str, "genanki.Model"]:
+        """Returns the Q&A note model for each configured deck type.
+        
+        Models are built on first access and shared by every DeckManager
+        using this config.
+        """
+        from .models import create_qa_model
+        
+        return {dt: create_qa_model(self, dt) for dt in self.deck_types}
     
     @property
     def deck_type_names(self) -> List[str]:
         """Returns lowercase list of Q&A deck type names (e.g., ['grammar', 'vocabulary'])."""
-        return [dt.lower() for dt in self.deck_types]
+        return list(self._deck_type_index)
     
     def get_deck_type(self, name: str) -> Optional[str]:
         """Look up a deck type by lowercase name, returning the original-case name."""
-        for dt in self.deck_types:
-            if dt.lower() == name.lower():
-                return dt
-        return None
+        return self._deck_type_index.get(name.lower())
 
 
 # Pre-defined language configurations
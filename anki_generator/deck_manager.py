@@ -2,14 +2,42 @@
 Deck management module.
 
 This module handles the creation and management of Anki decks,
-including the hierarchical deck structure for vocabulary chapters and Q&A decks.
+one Q&A deck per deck type under the language (e.g., German::Grammar).
 """
 
-import genanki
-from typing import Dict, List
+import threading
+
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, List, NamedTuple, Set, Tuple
 from .config import LanguageConfig
 from .models import create_qa_model
 
+if TYPE_CHECKING:
+    import genanki
+
+
+# Write buffer for .apkg files
+_EXPORT_BUFFER_SIZE = 1 << 20
+
+
+class _QAPending(NamedTuple):
+    """A Q&A card waiting to be turned into a genanki note on export."""
+    question: str
+    answer: str
+
+
+class _QADeck:
+    """Everything DeckManager tracks for one Q&A deck type."""
+    
+    __slots__ = ('deck', 'pending', 'seen')
+    
+    def __init__(self, deck: "genanki.Deck"):
+        self.deck = deck
+        # Cards added since the last export
+        self.pending: List[_QAPending] = []
+        # Every card in the deck. Exported notes stay in the deck and are
+        # written again by the next export, so this isn't cleared on export
+        self.seen: Set[_QAPending] = set()
+
 
 class DeckManager:
     """Manages Anki decks for a specific language configuration.
@@ -18,8 +46,15 @@ class DeckManager:
     - Creating Q&A decks (e.g., German::Vocabulary, Chinese::Radicals)
     - Adding notes to decks
     - Exporting all decks to an .apkg file
+    
+    Cards are buffered as lightweight records and only turned into
+    genanki notes when the decks are exported. Adding cards and exporting
+    are serialized by a lock, so an export may run on a background thread
+    while more cards are added.
     """
     
+    __slots__ = ('config', '_qa_decks', '_all_decks', '_lock')
+    
     def __init__(self, config: LanguageConfig):
         """Initialize the deck manager.
         
@@ -27,26 +62,28 @@ class DeckManager:
             config: The language configuration to use.
         """
         self.config = config
-        self._qa_decks: Dict[str, genanki.Deck] = {}
-        
-        # Create Q&A models for each deck type
-        self._qa_models: Dict[str, genanki.Model] = {}
-        for dt in config.deck_types:
-            self._qa_models[dt] = create_qa_model(config, dt)
+        # One entry per deck type, so adding a card costs a single lookup
+        self._qa_decks: Dict[str, _QADeck] = {}
+        # Decks in creation order; _qa_decks is only an index into this list
+        self._all_decks: List[genanki.Deck] = []
+        # Guards the card buffers and decks against a concurrent export
+        self._lock = threading.RLock()
     
-    def _generate_deck_id(self, deck_name: str) -> int:
-        """Generate a consistent deck ID from the deck name.
-        
-        Args:
-            deck_name: The full deck name.
+    def _get_qa_deck(self, deck_type: str) -> _QADeck:
+        """Get the tracked state for a deck type, creating the deck if needed."""
+        qa_deck = self._qa_decks.get(deck_type)
+        if qa_deck is None:
+            import genanki
             
-        Returns:
-            A unique deck ID.
-        """
-        return abs(hash(deck_name)) % (1 << 30) + (1 << 30)
-    
+            with self._lock:
+                qa_deck = self._qa_decks.get(deck_type)
+                if qa_deck is None:
+                    deck = genanki.Deck(self.config.qa_deck_id(deck_type), self.config.qa_deck_name(deck_type))
+                    qa_deck = self._qa_decks[deck_type] = _QADeck(deck)
+                    self._all_decks.append(deck)
+        return qa_deck
     
-    def create_qa_deck(self, deck_type: str) -> genanki.Deck:
+    def create_qa_deck(self, deck_type: str) -> "genanki.Deck":
         """Create a Q&A deck for the given type (e.g., Grammar, Radicals).
         
         Args:
@@ -55,48 +92,97 @@ class DeckManager:
         Returns:
             The created or existing deck for this type.
         """
-        if deck_type in self._qa_decks:
-            return self._qa_decks[deck_type]
-        
-        deck_name = self.config.qa_deck_name(deck_type)
-        deck_id = self._generate_deck_id(deck_name)
-        
-        self._qa_decks[deck_type] = genanki.Deck(deck_id, deck_name)
-        
-        return self._qa_decks[deck_type]
+        return self._get_qa_deck(deck_type).deck
     
     
     def add_qa_card(self, deck_type: str, question: str, answer: str) -> None:
         """Add a Q&A card to a specific deck type.
         
+        Cards whose question and answer were already added to the same
+        deck type are skipped, including cards added before an earlier
+        export: every export writes all cards added so far, so adding one
+        again would duplicate it.
+        
         Args:
             deck_type: The deck type name (e.g., "Grammar", "Radicals").
             question: The question or prompt.
             answer: The answer.
         """
-        # Ensure the deck exists
-        if deck_type not in self._qa_decks:
-            self.create_qa_deck(deck_type)
-        
-        model = self._qa_models.get(deck_type)
-        if model is None:
-            # Create model on the fly for dynamically added types
-            model = create_qa_model(self.config, deck_type)
-            self._qa_models[deck_type] = model
-        
-        note = genanki.Note(
-            model=model,
-            fields=[question, answer]
-        )
-        self._qa_decks[deck_type].add_note(note)
-    
-    def get_all_decks(self) -> List[genanki.Deck]:
+        qa_deck = self._qa_decks.get(deck_type) or self._get_qa_deck(deck_type)
+        
+        card = _QAPending(question, answer)
+        with self._lock:
+            if card in qa_deck.seen:
+                return
+            qa_deck.seen.add(card)
+            qa_deck.pending.append(card)
+    
+    def extend_qa_cards(self, deck_type: str, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Add many Q&A cards to a specific deck type at once.
+        
+        Behaves like calling add_qa_card for every pair, including skipping
+        duplicates, without the per-card method call overhead.
+        
+        Args:
+            deck_type: The deck type name (e.g., "Grammar", "Radicals").
+            pairs: (question, answer) pairs to add.
+        
+        Returns:
+            The number of cards added (duplicates are not counted).
+        """
+        qa_deck = self._get_qa_deck(deck_type)
+        
+        with self._lock:
+            pending = qa_deck.pending
+            start = len(pending)
+            append = pending.append
+            seen = qa_deck.seen
+            seen_add = seen.add
+            for question, answer in pairs:
+                card = _QAPending(question, answer)
+                if card not in seen:
+                    seen_add(card)
+                    append(card)
+            return len(pending) - start
+    
+    def _flush(self) -> None:
+        """Turn all buffered cards into notes on their decks."""
+        import genanki
+        
+        _Note = genanki.Note
+        # Same GUID scheme genanki uses by default, so re-imported notes still
+        # update their existing copies in Anki instead of duplicating them
+        _guid = genanki.guid_for
+        models = self.config.qa_models
+        for deck_type, qa_deck in self._qa_decks.items():
+            if not qa_deck.pending:
+                continue
+            # Deck types added at runtime are not part of the config's models
+            model = models.get(deck_type) or create_qa_model(self.config, deck_type)
+            # Deck.add_note only appends, so extend the list in one go
+            qa_deck.deck.notes.extend([
+                _Note(model=model, fields=[question, answer], guid=_guid(question, answer))
+                for question, answer in qa_deck.pending
+            ])
+            qa_deck.pending = []
+    
+    def get_all_decks(self) -> List["genanki.Deck"]:
         """Get all decks managed by this manager.
         
         Returns:
             A list of all decks.
         """
-        return list(self._qa_decks.values())
+        return list(self._all_decks)
+    
+    def _build_package(self) -> "genanki.Package":
+        """Flush pending cards and wrap all decks in a genanki package."""
+        self._flush()
+        if not self._all_decks:
+            raise ValueError("No decks to export. Create at least one deck first.")
+        
+        import genanki
+        
+        return genanki.Package(self._all_decks)
     
     def export(self, filename: str) -> None:
         """Export all decks to an .apkg file.
@@ -104,9 +190,23 @@ class DeckManager:
         Args:
             filename: The output filename (should end with .apkg).
         """
-        decks = self.get_all_decks()
-        if not decks:
-            raise ValueError("No decks to export. Create at least one deck first.")
+        with self._lock:
+            package = self._build_package()
+            # zipfile issues many small writes; a large buffer batches them
+            with open(filename, "wb", buffering=_EXPORT_BUFFER_SIZE) as f:
+                package.write_to_file(f)
+    
+    def export_to_fileobj(self, fileobj: BinaryIO) -> None:
+        """Export all decks as .apkg data into a writable binary file object.
+        
+        The package is streamed straight into the file object, so it can be
+        sent to a socket, an upload stream or an in-memory buffer without
+        writing it to disk first.
         
-        package = genanki.Package(decks)
-        package.write_to_file(filename)
+        Args:
+            fileobj: A writable binary file object. It does not need to be
+                seekable and is not closed.
+        """
+        with self._lock:
+            self._build_package().write_to_file(fileobj)
+
@@ -0,0 +1,27 @@
+"""
+Stable ID generation for Anki decks and models.
+
+Anki identifies decks and note models by integer IDs. These helpers derive
+them from names so the same deck or model gets the same ID on every run.
+"""
+
+import functools
+import hashlib
+
+
+@functools.lru_cache(maxsize=256)
+def stable_id(name: str) -> int:
+    """Derive a stable Anki ID from a name.
+    
+    Unlike the built-in hash(), the result does not depend on the
+    interpreter's hash seed, so re-exported decks keep their IDs and Anki
+    keeps the scheduling history of their cards.
+    
+    Args:
+        name: The deck or model name to derive the ID from.
+        
+    Returns:
+        An ID in the range [2**30, 2**31).
+    """
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=5).digest()
+    return int.from_bytes(digest, "big") % (1 << 30) + (1 << 30)
@@ -1,12 +1,18 @@
 """
 Card model definitions for Anki.
 
-This module defines the card templates for vocabulary and grammar cards,
-including TTS support for the native language.
+This module defines the card template and styling shared by all Q&A
+deck types (Vocabulary, Grammar, Radicals, ...).
 """
 
-import genanki
+import functools
+from typing import TYPE_CHECKING
+
 from .config import LanguageConfig
+from .ids import stable_id
+
+if TYPE_CHECKING:
+    import genanki
 
 
 # CSS styling for cards
@@ -59,12 +65,33 @@ hr#answer {
 """
 
 
-def create_qa_model(config: LanguageConfig, deck_type_name: str) -> genanki.Model:
+# Fields shared by every Q&A model. genanki fills in per-field defaults
+# (ord, font, ...) in place, which is idempotent, so the dicts can be shared.
+_QA_FIELDS = (
+    {'name': 'Question'},
+    {'name': 'Answer'},
+)
+
+_QA_QFMT = '''
+                    <div class="word">{{Question}}</div>
+                '''
+
+_QA_AFMT = '''
+                    {{FrontSide}}
+                    <hr id="answer">
+                    <div class="translation">{{Answer}}</div>
+                '''
+
+
+def create_qa_model(config: LanguageConfig, deck_type_name: str) -> "genanki.Model":
     """Create a model for Q&A cards (Grammar, Radicals, etc.).
     
     - Front: Question
     - Back: Answer
     
+    Models are cached per (language, deck type), so repeated calls return
+    the same object.
+    
     Args:
         config: The language configuration to use.
         deck_type_name: The deck type name (e.g., "Grammar", "Radicals").
@@ -72,27 +99,32 @@ def create_qa_model(config: LanguageConfig, deck_type_name: str) -> genanki.Mode
     Returns:
         A genanki Model configured for Q&A cards.
     """
-    model_id = abs(hash(f"{config.name}_{deck_type_name.lower()}_v3")) % (1 << 30) + (1 << 30)
+    return _build_qa_model(config.name, deck_type_name)
+
+
+@functools.lru_cache(maxsize=64)
+def _qa_templates(deck_type_name: str) -> list:
+    """Build the card templates for a Q&A deck type."""
+    return [
+        {
+            'name': f'{deck_type_name} Card',
+            'qfmt': _QA_QFMT,
+            'afmt': _QA_AFMT,
+        },
+    ]
+
+
+@functools.lru_cache(maxsize=64)
+def _build_qa_model(language_name: str, deck_type_name: str) -> "genanki.Model":
+    """Build the Q&A model for a language name and deck type name."""
+    import genanki
+    
+    model_id = stable_id(f"{language_name}_{deck_type_name.lower()}_v3")
     
     return genanki.Model(
         model_id,
-        f'{config.name} {deck_type_name}',
-        fields=[
-            {'name': 'Question'},
-            {'name': 'Answer'},
-        ],
-        templates=[
-            {
-                'name': f'{deck_type_name} Card',
-                'qfmt': '''
-                    <div class="word">{{Question}}</div>
-                ''',
-                'afmt': '''
-                    {{FrontSide}}
-                    <hr id="answer">
-                    <div class="translation">{{Answer}}</div>
-                ''',
-            },
-        ],
+        f'{language_name} {deck_type_name}',
+        fields=list(_QA_FIELDS),
+        templates=_qa_templates(deck_type_name),
         css=CARD_CSS
     )
@@ -9,10 +9,17 @@ This module provides functionality to:
 - Integrate with the anki_generator module
 """
 
-from .generator import PDFCardGenerator
-from .gemini_client import GeminiClient
-from .deck_registry import DeckRegistry
-from .pdf_processor import extract_pages_as_pdf, get_pdf_page_count
+import importlib
+
+# Public names are resolved on first access so that importing a single
+# submodule (or running the CLI) doesn't pull in google-genai and PyMuPDF.
+_LAZY_ATTRS = {
+    "PDFCardGenerator": ".generator",
+    "GeminiClient": ".gemini_client",
+    "DeckRegistry": ".deck_registry",
+    "extract_pages_as_pdf": ".pdf_processor",
+    "get_pdf_page_count": ".pdf_processor",
+}
 
 __all__ = [
     "PDFCardGenerator",
@@ -21,3 +28,16 @@ __all__ = [
     "extract_pages_as_pdf",
     "get_pdf_page_count",
 ]
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
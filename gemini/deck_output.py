@@ -0,0 +1,82 @@
+"""
+Deck type lookup and .apkg export shared by the card generators.
+
+Nothing here imports google-genai or PyMuPDF, so CardGenerator can use
+it for JSON imports without loading them.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+class DeckOutputMixin(ABC):
+    """Content type resolution and export for PDFCardGenerator and CardGenerator.
+    
+    Subclasses set _config, anki, registry, output_file and
+    _is_default_output, call _init_deck_types() once _config is set, and
+    implement _write_deck().
+    """
+    
+    def _init_deck_types(self) -> None:
+        """Build the output folders and content type table for _config."""
+        # Output folder for this language, with one subfolder per deck type
+        self._base_output_dir = Path("generated_cards") / self._config.name
+        # Normalized content type -> (deck type name, its output folder)
+        self._ct_table: Dict[str, Tuple[str, Path]] = {
+            dt.lower(): (dt, self._base_output_dir / dt.lower())
+            for dt in self._config.deck_types
+        }
+    
+    def _resolve_deck_type(self, content_type: str) -> str:
+        """Map a lowercase content type to its configured deck type name."""
+        entry = self._ct_table.get(content_type)
+        return entry[0] if entry is not None else content_type.title()
+    
+    def _validate_content_type(self, content_type: str) -> str:
+        """Lowercase a user-supplied content type and check it is configured."""
+        content_type = content_type.lower()
+        if content_type not in self._ct_table:
+            raise ValueError(
+                f"Invalid content type '{content_type}' for {self._config.name}. "
+                f"Valid types: {', '.join(self._config.deck_type_names)}"
+            )
+        return content_type
+    
+    @staticmethod
+    def _validate_ranges(ranges: List[Tuple[int, int]]) -> None:
+        """Check that a multi-range request was given at least one page range."""
+        if not ranges:
+            raise ValueError("At least one page range is required")
+    
+    def _export(self, deck_types: List[str], verbose: bool) -> None:
+        """Resolve the output path for the given deck types and export.
+        
+        A single deck type exports under its own folder; several share the
+        language folder.
+        """
+        if len(deck_types) == 1:
+            entry = self._ct_table.get(deck_types[0].lower())
+            output_dir = entry[1] if entry is not None else self._base_output_dir / deck_types[0].lower()
+        else:
+            output_dir = self._base_output_dir
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        if self._is_default_output:
+            if len(deck_types) == 1:
+                self.output_file = str(output_dir / f"{self._config.name}_{deck_types[0]}.apkg")
+            else:
+                self.output_file = str(output_dir / f"{self._config.name}_learning_deck.apkg")
+        else:
+            out_path = Path(self.output_file)
+            if str(out_path.parent) == ".":
+                self.output_file = str(output_dir / self.output_file)
+        if verbose:
+            print(f"💾 Exporting to {self.output_file}...")
+        
+        self._write_deck()
+        self.registry.flush()
+    
+    @abstractmethod
+    def _write_deck(self) -> None:
+        """Write the Anki decks to self.output_file."""
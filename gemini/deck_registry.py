@@ -5,16 +5,38 @@ Maintains a JSON file to track which vocabulary categories have been created,
 enabling the system to extend existing decks rather than creating duplicates.
 """
 
-import json
+import copy
+import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
+
+from . import jsonlib
+
+# Parsed registries by resolved path, tagged with (st_mtime_ns, st_size),
+# most recently used last
+_REGISTRY_CACHE: "OrderedDict[Path, Tuple[int, int, dict]]" = OrderedDict()
+_REGISTRY_CACHE_MAX = 8
+
+
+def _cache_registry(path: Path, stat: os.stat_result, data: dict) -> None:
+    """Remember a copy of a parsed registry, evicting the least recently used."""
+    _REGISTRY_CACHE[path] = (stat.st_mtime_ns, stat.st_size, copy.deepcopy(data))
+    _REGISTRY_CACHE.move_to_end(path)
+    while len(_REGISTRY_CACHE) > _REGISTRY_CACHE_MAX:
+        _REGISTRY_CACHE.popitem(last=False)
 
 
 class DeckRegistry:
     """Tracks vocabulary categories to determine extend vs create behavior.
     
     Maintains a JSON registry file that stores vocabulary categories
-    that have been created.
+    that have been created. New categories are written to disk by flush(),
+    or automatically when the registry is used as a context manager.
+    
+    Example usage:
+        >>> with DeckRegistry("deck_registry.json") as registry:
+        ...     registry.register_vocabulary_category("Body Parts")
     """
     
     def __init__(self, registry_path: str = "deck_registry.json"):
@@ -25,18 +47,59 @@ class DeckRegistry:
         """
         self.registry_path = Path(registry_path)
         self._data = self._load_registry()
+        self._dirty = False
+        # Case-folded name -> original name, so lookups don't scan the list.
+        # Only the list is written to disk; the first spelling wins.
+        self._lower_to_original: Dict[str, str] = {}
+        for category in self._data["vocabulary_categories"]:
+            self._lower_to_original.setdefault(category.lower().strip(), category)
     
     def _load_registry(self) -> dict:
         """Load the registry from disk, or create a new one."""
-        if self.registry_path.exists():
-            with open(self.registry_path, "r") as f:
-                return json.load(f)
-        return {"vocabulary_categories": []}
+        try:
+            stat = self.registry_path.stat()
+        except FileNotFoundError:
+            return {"vocabulary_categories": []}
+        
+        # Skip re-parsing a file another instance already loaded unchanged
+        cache_key = self.registry_path.resolve()
+        cached = _REGISTRY_CACHE.get(cache_key)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            _REGISTRY_CACHE.move_to_end(cache_key)
+            return copy.deepcopy(cached[2])
+        
+        with open(self.registry_path, "rb") as f:
+            data = jsonlib.loads(f.read())
+        _cache_registry(cache_key, stat, data)
+        return data
     
     def _save_registry(self) -> None:
-        """Save the registry to disk."""
-        with open(self.registry_path, "w") as f:
-            json.dump(self._data, f, indent=2)
+        """Save the registry to disk.
+        
+        Writes to a temporary sibling file and atomically replaces the
+        registry, so an interrupted save never leaves a truncated file.
+        """
+        tmp_path = self.registry_path.with_suffix(self.registry_path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(jsonlib.dumps_pretty(self._data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.registry_path)
+        # Seed the cache with what was just written, so the next registry
+        # opened on this path (e.g. the next CardGenerator) doesn't parse it
+        _cache_registry(self.registry_path.resolve(), self.registry_path.stat(), self._data)
+    
+    def flush(self) -> None:
+        """Write pending changes to disk, if there are any."""
+        if self._dirty:
+            self._save_registry()
+            self._dirty = False
+    
+    def __enter__(self) -> "DeckRegistry":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
     
     def vocabulary_category_exists(self, category: str) -> bool:
         """Check if a vocabulary category deck exists.
@@ -47,19 +110,21 @@ class DeckRegistry:
         Returns:
             True if the category exists, False otherwise.
         """
-        normalized = category.lower().strip()
-        existing = [c.lower() for c in self._data["vocabulary_categories"]]
-        return normalized in existing
+        return category.lower().strip() in self._lower_to_original
     
     def register_vocabulary_category(self, category: str) -> None:
         """Register a new vocabulary category.
         
+        The change is kept in memory until flush() is called.
+        
         Args:
             category: The category name to register.
         """
-        if not self.vocabulary_category_exists(category):
+        key = category.lower().strip()
+        if key not in self._lower_to_original:
+            self._lower_to_original[key] = category
             self._data["vocabulary_categories"].append(category)
-            self._save_registry()
+            self._dirty = True
     
     def get_vocabulary_categories(self) -> List[str]:
         """Get all registered vocabulary categories.
@@ -67,7 +132,7 @@ class DeckRegistry:
         Returns:
             List of all vocabulary category names.
         """
-        return self._data["vocabulary_categories"].copy()
+        return list(self._data["vocabulary_categories"])
     
     def find_matching_category(self, category: str) -> Optional[str]:
         """Find an existing category that matches the given one.
@@ -78,8 +143,4 @@ class DeckRegistry:
         Returns:
             The matching category name with original casing, or None if not found.
         """
-        normalized = category.lower().strip()
-        for existing in self._data["vocabulary_categories"]:
-            if existing.lower() == normalized:
-                return existing
-        return None
+        return self._lower_to_original.get(category.lower().strip())
@@ -4,15 +4,175 @@ Gemini API client for content classification and card generation.
 Uses PDF bytes directly instead of extracted text for better comprehension.
 """
 
+import asyncio
+import hashlib
+import io
 import json
 import os
 import re
-from typing import Optional, List, Dict, Tuple
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Optional, List, Dict, Tuple
 
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
-from .prompts import build_classification_prompt, get_deck_type_prompt
+from . import jsonlib
+from .prompts import (
+    build_batch_prompt,
+    build_classification_prompt,
+    build_combined_prompt,
+    get_deck_type_prompt,
+)
+
+# Location of the on-disk response cache when the CLI's --cache is given
+CACHE_DIR = Path(".gemini_cache")
+# Cached responses older than this many seconds are ignored and replaced
+CACHE_MAX_AGE = 7 * 24 * 3600
+# Oldest responses are evicted beyond this total size
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# PDFs at least this large go through the File API instead of inline bytes
+UPLOAD_THRESHOLD = 8 * 1024 * 1024
+
+# Lifetime of server-side prompt caches; release_uploads() deletes them earlier
+CONTEXT_CACHE_TTL = "3600s"
+
+# Seconds between polls while an uploaded PDF is still PROCESSING
+UPLOAD_POLL_INTERVAL = 1.0
+
+# Retries of an async request rejected with HTTP 429, and the longest wait
+RATE_LIMIT_RETRIES = 5
+_MAX_RETRY_DELAY = 60.0
+
+# genai clients shared per API key, so repeated GeminiClients reuse connections
+_CLIENT_CACHE: Dict[str, genai.Client] = {}
+
+
+def _get_client(api_key: str) -> genai.Client:
+    """Return the shared genai.Client for an API key, creating it on first use."""
+    client = _CLIENT_CACHE.get(api_key)
+    if client is None:
+        client = _CLIENT_CACHE[api_key] = genai.Client(api_key=api_key)
+    return client
+
+
+def _retry_delay(error: errors.APIError, attempt: int) -> float:
+    """Seconds to wait before retrying a 429: the server's RetryInfo delay, else exponential."""
+    body = error.details.get("error", {}) if isinstance(error.details, dict) else {}
+    for detail in body.get("details", ()) if isinstance(body, dict) else ():
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        if isinstance(delay, str) and delay.endswith("s"):
+            try:
+                return min(float(delay[:-1]), _MAX_RETRY_DELAY)
+            except ValueError:
+                pass
+    return min(2.0 ** attempt, _MAX_RETRY_DELAY)
+
+
+def _evict_response_cache(cache_dir: Path, max_bytes: int = CACHE_MAX_BYTES) -> None:
+    """Delete expired responses, then the oldest ones until the cache fits in max_bytes."""
+    expired_before = time.time() - CACHE_MAX_AGE
+    entries = []
+    total = 0
+    for entry in os.scandir(cache_dir):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            stat = entry.stat()
+            if stat.st_mtime < expired_before:
+                os.remove(entry.path)
+                continue
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total += stat.st_size
+    if total <= max_bytes:
+        return
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
+
+
+def _create_once(lock: threading.Lock, futures: Dict[str, Future], key: str, create: Callable[[], Any]) -> Any:
+    """Return the value create() made for key, creating it on first use.
+    
+    The lock is held only to look up or insert the key's Future, so values
+    for different keys are created concurrently. Threads asking for a key
+    that is still being created wait on its Future. If create() raises,
+    the key is forgotten so a later call can retry.
+    """
+    with lock:
+        future = futures.get(key)
+        creating = future is None
+        if creating:
+            future = futures[key] = Future()
+    if creating:
+        try:
+            future.set_result(create())
+        except BaseException as e:
+            with lock:
+                futures.pop(key, None)
+            future.set_exception(e)
+            raise
+    return future.result()
+
+
+class _RateLimiter:
+    """Token bucket that spaces async requests out to a steady rate.
+    
+    Up to one second's worth of requests may go out back to back. Each
+    acquire() takes a token right away, possibly going into debt, and then
+    sleeps until that debt is paid off. That keeps the bucket consistent
+    without a lock, since nothing awaits between reading and updating it.
+    """
+    
+    def __init__(self, rate: float):
+        self._rate = rate
+        self._capacity = max(rate, 1.0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+    
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self._rate)
+
+
+# Fallback patterns for responses the single-pass scan can't decode
+_CODE_BLOCK_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+_JSON_OBJ_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def _parse_cards(data: Any) -> List[Dict[str, str]]:
+    """Validate the "cards" of a decoded response into question/answer dicts.
+    
+    The model occasionally emits cards with a missing or non-string field;
+    those are dropped here, once, so consumers can index card["question"]
+    and card["answer"] without checks. Extra keys are discarded.
+    """
+    cards = data.get("cards") if isinstance(data, dict) else None
+    if not isinstance(cards, list):
+        return []
+    parsed = []
+    append = parsed.append
+    for card in cards:
+        if isinstance(card, dict):
+            question = card.get("question")
+            answer = card.get("answer")
+            if isinstance(question, str) and isinstance(answer, str):
+                append({"question": question, "answer": answer})
+    return parsed
 
 
 class GeminiClient:
@@ -22,27 +182,71 @@ class GeminiClient:
     Accepts PDF bytes directly for better document understanding.
     """
     
-    def __init__(self, config, api_key: Optional[str] = None, model: str = "gemini-2.0-flash"):
+    _DECODER = json.JSONDecoder()
+    
+    def __init__(
+        self,
+        config,
+        api_key: Optional[str] = None,
+        model: str = "gemini-2.0-flash",
+        cache_dir: Optional[Path] = None,
+        client: Optional[genai.Client] = None,
+        context_cache: bool = False,
+        requests_per_second: Optional[float] = None
+    ):
         """Initialize the Gemini client.
         
         Args:
             config: A LanguageConfig object with name, deck_types, etc.
             api_key: The Gemini API key. If None, reads from GEMINI_API_KEY env var.
             model: The Gemini model to use. Defaults to gemini-2.0-flash.
+            cache_dir: Optional directory for cached responses, keyed by PDF
+                content, model and the full prompt (including the template
+                and custom instructions). Entries expire after CACHE_MAX_AGE
+                seconds. By default every request calls the API.
+            client: Optional genai.Client to use. By default a client is
+                shared between all GeminiClients with the same API key.
+            context_cache: Whether to register card prompts as Gemini
+                cached content, so repeated requests don't re-bill the
+                prompt tokens. Prompts below the model's minimum cache size
+                are sent inline as usual.
+            requests_per_second: Optional cap on the rate of async requests,
+                e.g. to stay under the API key's quota when many page
+                ranges are processed concurrently.
         
         Raises:
             ValueError: If no API key is provided or found in environment.
         """
         self.api_key = api_key or os.environ.get("GEMINI_API_KEY")
-        if not self.api_key:
+        if client is None and not self.api_key:
             raise ValueError(
                 "Gemini API key required. Provide via api_key parameter or "
                 "set GEMINI_API_KEY environment variable."
             )
         
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = client if client is not None else _get_client(self.api_key)
+        self._owns_client = client is None
+        # Async client of the running event loop; see _aio_client()
+        self._aio: Optional[Any] = None
+        self._aio_loop: Optional[asyncio.AbstractEventLoop] = None
         self.model = model
         self.config = config
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        
+        # Uploaded File handles by PDF digest, shared by classify and generate.
+        # The lock only guards the dict; each upload runs outside it.
+        self._uploads: Dict[str, "Future[types.File]"] = {}
+        self._upload_lock = threading.Lock()
+        # Cached content names by prompt; None marks prompts that can't be cached
+        self._context_cache = context_cache
+        self._context_caches: Dict[str, "Future[Optional[str]]"] = {}
+        self._context_cache_lock = threading.Lock()
+        self._last_digest: Tuple[Optional[bytes], str] = (None, "")
+        self._rate_limiter = _RateLimiter(requests_per_second) if requests_per_second else None
+        
+        # Lowercased deck types, hoisted out of classify_content()
+        self._deck_types_lower = [dt.lower() for dt in config.deck_types]
+        self._fallback_type = self._deck_types_lower[0] if self._deck_types_lower else "vocabulary"
         
         # Build classification prompt from config's deck types
         self._classification_prompt = build_classification_prompt(
@@ -64,19 +268,229 @@ class GeminiClient:
         if not text:
             raise ValueError("Gemini returned empty response. The model may have failed to process the PDF.")
         
-        # Try to find JSON in code blocks first
-        code_block_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', text)
-        if code_block_match:
-            json_str = code_block_match.group(1)
+        # Narrow to the body of a ```json fence if the model added one
+        start, end = 0, len(text)
+        fence = text.find("```")
+        if fence != -1:
+            body = text.find("\n", fence)
+            close = text.find("```", body) if body != -1 else -1
+            if close != -1:
+                start, end = body + 1, close
+        
+        # Fast path: the (fenced) payload is exactly one JSON document
+        try:
+            return jsonlib.loads(text[start:end])
+        except ValueError:
+            pass
+        
+        # Decode from the first object/array; raw_decode ignores trailing text
+        brace = text.find("{", start, end)
+        bracket = text.find("[", start, end)
+        candidates = [i for i in (brace, bracket) if i != -1]
+        if candidates:
+            start = min(candidates)
         else:
-            # Try to find raw JSON
-            json_match = re.search(r'\{[\s\S]*\}', text)
-            if json_match:
-                json_str = json_match.group(0)
+            text = text[start:end].strip()
+            start = 0
+        
+        try:
+            obj, _ = self._DECODER.raw_decode(text, start)
+            return obj
+        except ValueError:
+            # The first bracket wasn't the payload (e.g. braces in prose)
+            match = _CODE_BLOCK_RE.search(text) or _JSON_OBJ_RE.search(text)
+            if match is None:
+                raise
+            return jsonlib.loads(match.group(match.lastindex or 0))
+    
+    def _pdf_digest(self, pdf_bytes: bytes) -> str:
+        """Hex digest of a PDF, memoized for the most recent buffer."""
+        last_bytes, last_digest = self._last_digest
+        if last_bytes is pdf_bytes:
+            return last_digest
+        digest = hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+        self._last_digest = (pdf_bytes, digest)
+        return digest
+    
+    def _pdf_part(self, pdf_bytes: bytes) -> types.Part:
+        """Build the request part for a PDF.
+        
+        Small PDFs are sent inline. Larger ones are uploaded once through the
+        File API and referenced by URI, so classification and generation of
+        the same pages don't each resend the whole document.
+        """
+        if len(pdf_bytes) < UPLOAD_THRESHOLD:
+            return types.Part.from_bytes(data=pdf_bytes, mime_type='application/pdf')
+        
+        uploaded = _create_once(
+            self._upload_lock, self._uploads, self._pdf_digest(pdf_bytes),
+            lambda: self._upload(pdf_bytes)
+        )
+        return types.Part.from_uri(file_uri=uploaded.uri, mime_type='application/pdf')
+    
+    def _upload(self, pdf_bytes: bytes) -> types.File:
+        """Upload a PDF through the File API and wait until it can be used.
+        
+        Raises:
+            RuntimeError: If the File API fails to process the PDF.
+        """
+        uploaded = self.client.files.upload(
+            file=io.BytesIO(pdf_bytes),
+            config=types.UploadFileConfig(mime_type='application/pdf')
+        )
+        while uploaded.state == types.FileState.PROCESSING:
+            time.sleep(UPLOAD_POLL_INTERVAL)
+            uploaded = self.client.files.get(name=uploaded.name)
+        if uploaded.state == types.FileState.FAILED:
+            raise RuntimeError(f"Gemini failed to process uploaded PDF {uploaded.name}")
+        return uploaded
+    
+    def _cached_content(self, prompt: str) -> Optional[str]:
+        """Return the cached content name for a prompt, creating it on first use."""
+        return _create_once(
+            self._context_cache_lock, self._context_caches, prompt,
+            lambda: self._create_context_cache(prompt)
+        )
+    
+    def _create_context_cache(self, prompt: str) -> Optional[str]:
+        """Cache a prompt on the server; None if it can't be cached."""
+        try:
+            cache = self.client.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=prompt,
+                    ttl=CONTEXT_CACHE_TTL
+                )
+            )
+            return cache.name
+        except Exception:
+            # Typically the prompt is under the model's minimum token count
+            return None
+    
+    def _generate(self, parts: List[types.Part], prompt: str) -> types.GenerateContentResponse:
+        """Send PDF parts and a prompt, using cached content for the prompt if enabled."""
+        cache_name = self._cached_content(prompt) if self._context_cache else None
+        if cache_name is None:
+            return self.client.models.generate_content(
+                model=self.model, contents=[*parts, prompt]
+            )
+        return self.client.models.generate_content(
+            model=self.model,
+            contents=parts,
+            config=types.GenerateContentConfig(cached_content=cache_name)
+        )
+    
+    async def _apdf_part(self, pdf_bytes: bytes) -> types.Part:
+        """Async _pdf_part(); a needed upload runs on a worker thread."""
+        if len(pdf_bytes) < UPLOAD_THRESHOLD:
+            return types.Part.from_bytes(data=pdf_bytes, mime_type='application/pdf')
+        return await asyncio.to_thread(self._pdf_part, pdf_bytes)
+    
+    async def _agenerate(self, parts: List[types.Part], prompt: str) -> types.GenerateContentResponse:
+        """Async _generate() through the genai client's aio interface."""
+        cache_name = None
+        if self._context_cache:
+            cache_name = await asyncio.to_thread(self._cached_content, prompt)
+        if cache_name is None:
+            return await self._agenerate_content(contents=[*parts, prompt])
+        return await self._agenerate_content(
+            contents=parts,
+            config=types.GenerateContentConfig(cached_content=cache_name)
+        )
+    
+    async def _agenerate_content(self, **kwargs: Any) -> types.GenerateContentResponse:
+        """Send an async request, rate limited and retried when Gemini returns HTTP 429."""
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire()
+            try:
+                return await self._aio_client().models.generate_content(model=self.model, **kwargs)
+            except errors.APIError as e:
+                if e.code != 429 or attempt == RATE_LIMIT_RETRIES:
+                    raise
+                await asyncio.sleep(_retry_delay(e, attempt))
+    
+    def _aio_client(self) -> Any:
+        """Return the async genai client for the running event loop.
+        
+        The async transport binds to the loop it first runs on, so the shared
+        client's aio interface breaks once that loop is closed by
+        asyncio.run(). A client created by this GeminiClient gets a fresh
+        async client per loop; an injected client is used as given.
+        """
+        loop = asyncio.get_running_loop()
+        if self._aio_loop is not loop:
+            if self._owns_client:
+                self._aio = genai.Client(api_key=self.api_key).aio
             else:
-                json_str = text
+                self._aio = self.client.aio
+            self._aio_loop = loop
+        return self._aio
+    
+    async def aclose(self) -> None:
+        """Close the async client created for the running event loop.
+        
+        Call before the loop ends, e.g. at the end of the coroutine passed
+        to asyncio.run(). The next async request creates a new one.
+        """
+        aio, self._aio, self._aio_loop = self._aio, None, None
+        if aio is not None and self._owns_client:
+            await aio.aclose()
+    
+    def release_uploads(self) -> None:
+        """Delete PDFs uploaded and prompt caches created by this client.
         
-        return json.loads(json_str)
+        They otherwise stay on the server until they expire. Safe to call
+        repeatedly; failures to delete are ignored.
+        """
+        with self._upload_lock:
+            uploads, self._uploads = self._uploads, {}
+        with self._context_cache_lock:
+            caches, self._context_caches = self._context_caches, {}
+        for future in uploads.values():
+            try:
+                # Waits for an upload still in flight, so it isn't left behind
+                self.client.files.delete(name=future.result().name)
+            except Exception:
+                pass
+        for future in caches.values():
+            name = future.result()
+            if name is None:
+                continue
+            try:
+                self.client.caches.delete(name=name)
+            except Exception:
+                pass
+    
+    def _cache_path(self, kind: str, pdf_bytes: bytes, prompt: str) -> Optional[Path]:
+        """Return the cache file for a request, or None if caching is off."""
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=16)
+        digest.update(f"\0{self.model}\0{self._pdf_digest(pdf_bytes)}".encode("utf-8"))
+        return self.cache_dir / f"{kind}_{digest.hexdigest()}.json"
+    
+    def _cache_load(self, path: Optional[Path]) -> Any:
+        """Load a cached response, or None on a miss, expired or unreadable entry."""
+        if path is None:
+            return None
+        try:
+            if time.time() - path.stat().st_mtime > CACHE_MAX_AGE:
+                return None
+            return jsonlib.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+    
+    def _cache_store(self, path: Optional[Path], value: Any) -> None:
+        """Atomically write a response to the cache, then evict old entries."""
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(jsonlib.dumps(value))
+        os.replace(tmp_path, path)
+        _evict_response_cache(path.parent)
     
     def classify_content(self, pdf_bytes: bytes) -> str:
         """Classify PDF content type.
@@ -87,23 +501,59 @@ class GeminiClient:
         Returns:
             A content type string (e.g., "grammar", "radicals", "vocabulary").
         """
+        cache_path = self._cache_path("classify", pdf_bytes, self._classification_prompt)
+        cached = self._cache_load(cache_path)
+        if isinstance(cached, str):
+            return cached
+        
         response = self.client.models.generate_content(
             model=self.model,
             contents=[
-                types.Part.from_bytes(data=pdf_bytes, mime_type='application/pdf'),
+                self._pdf_part(pdf_bytes),
                 self._classification_prompt
             ]
         )
-        result = response.text.strip().lower()
+        content_type = self._match_deck_type(response.text.strip().lower())
+        self._cache_store(cache_path, content_type)
+        return content_type
+    
+    async def aclassify_content(self, pdf_bytes: bytes) -> str:
+        """Async classify_content(), sharing its response cache."""
+        cache_path = self._cache_path("classify", pdf_bytes, self._classification_prompt)
+        cached = self._cache_load(cache_path)
+        if isinstance(cached, str):
+            return cached
         
+        response = await self._agenerate_content(
+            contents=[
+                await self._apdf_part(pdf_bytes),
+                self._classification_prompt
+            ]
+        )
+        content_type = self._match_deck_type(response.text.strip().lower())
+        self._cache_store(cache_path, content_type)
+        return content_type
+    
+    def _match_deck_type(self, result: str) -> str:
+        """Map a classification response onto a configured deck type."""
         # Check against all configured deck types
-        for dt in self.config.deck_types:
-            if dt.lower() in result:
-                return dt.lower()
+        for dt_lower in self._deck_types_lower:
+            if dt_lower in result:
+                return dt_lower
         # Fallback to the first available deck type
-        if self.config.deck_types:
-            return self.config.deck_types[0].lower()
-        return "vocabulary"
+        return self._fallback_type
+    
+    def _qa_prompt(
+        self,
+        deck_type: str,
+        custom_prompt: Optional[str] = None,
+        template: Optional[str] = None
+    ) -> str:
+        """Build the card generation prompt for a deck type with any custom instructions."""
+        prompt = get_deck_type_prompt(self.config.name, deck_type, template=template)
+        if custom_prompt:
+            prompt = f"{prompt}\n\nAdditional instructions: {custom_prompt}"
+        return prompt
     
     def generate_qa_cards(
         self,
@@ -123,19 +573,160 @@ class GeminiClient:
         Returns:
             List of dicts with 'question' and 'answer' keys.
         """
-        prompt = get_deck_type_prompt(self.config.name, deck_type, template=template)
-        if custom_prompt:
-            prompt = f"{prompt}\n\nAdditional instructions: {custom_prompt}"
+        prompt = self._qa_prompt(deck_type, custom_prompt, template)
         
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=[
-                types.Part.from_bytes(data=pdf_bytes, mime_type='application/pdf'),
-                prompt
-            ]
-        )
+        cache_path = self._cache_path("cards", pdf_bytes, prompt)
+        cached = self._cache_load(cache_path)
+        if isinstance(cached, list):
+            return cached
+        
+        response = self._generate([self._pdf_part(pdf_bytes)], prompt)
+        
+        cards = _parse_cards(self._extract_json(response.text))
+        # Don't cache empty results so a failed generation can be retried
+        if cards:
+            self._cache_store(cache_path, cards)
+        return cards
+    
+    async def agenerate_qa_cards(
+        self,
+        deck_type: str,
+        pdf_bytes: bytes,
+        custom_prompt: Optional[str] = None,
+        template: Optional[str] = None
+    ) -> List[Dict]:
+        """Async generate_qa_cards(), sharing its response cache.
+        
+        Several of these can be awaited together (e.g. with asyncio.gather)
+        so the requests for different page ranges overlap.
+        """
+        prompt = self._qa_prompt(deck_type, custom_prompt, template)
+        
+        cache_path = self._cache_path("cards", pdf_bytes, prompt)
+        cached = self._cache_load(cache_path)
+        if isinstance(cached, list):
+            return cached
+        
+        response = await self._agenerate([await self._apdf_part(pdf_bytes)], prompt)
+        
+        cards = _parse_cards(self._extract_json(response.text))
+        if cards:
+            self._cache_store(cache_path, cards)
+        return cards
+    
+    def classify_and_generate(
+        self,
+        pdf_bytes: bytes,
+        custom_prompt: Optional[str] = None,
+        template: Optional[str] = None
+    ) -> Tuple[str, List[Dict]]:
+        """Classify PDF content and generate its Q&A cards in a single request.
+        
+        Args:
+            pdf_bytes: The PDF pages as bytes.
+            custom_prompt: Optional additional instructions to append to the prompt.
+            template: Optional card formatting template (e.g., "basic", "detailed").
+            
+        Returns:
+            Tuple of (content type string, list of dicts with 'question' and
+            'answer' keys).
+        """
+        prompt = self._combined_prompt(custom_prompt, template)
+        
+        cache_path = self._cache_path("combined", pdf_bytes, prompt)
+        cached = self._cache_load(cache_path)
+        if isinstance(cached, list) and len(cached) == 2:
+            return cached[0], cached[1]
+        
+        response = self._generate([self._pdf_part(pdf_bytes)], prompt)
         
         data = self._extract_json(response.text)
-        return data.get("cards", [])
+        if not isinstance(data, dict):
+            # Valid JSON but not the requested object (e.g. a bare list of
+            # cards without its content type): classify and generate separately
+            content_type = self.classify_content(pdf_bytes)
+            deck_type = self.config.get_deck_type(content_type) or content_type
+            return content_type, self.generate_qa_cards(deck_type, pdf_bytes, custom_prompt, template)
+        content_type = self._match_deck_type(str(data.get("content_type", "")).strip().lower())
+        cards = _parse_cards(data)
+        if cards:
+            self._cache_store(cache_path, [content_type, cards])
+        return content_type, cards
     
-
+    def generate_qa_cards_batch(
+        self,
+        deck_type: str,
+        pdf_bytes_list: List[bytes],
+        custom_prompt: Optional[str] = None,
+        template: Optional[str] = None
+    ) -> List[List[Dict]]:
+        """Generate Q&A cards for several PDFs of one deck type in a single request.
+        
+        Sending all documents with one prompt saves a round-trip and the
+        repeated prompt tokens per document. Results are cached per document
+        under the same key generate_qa_cards() uses, so only documents that
+        were never processed before are sent.
+        
+        Args:
+            deck_type: The deck type name (e.g., "Grammar", "Radicals").
+            pdf_bytes_list: The PDF documents as bytes, one per page range.
+            custom_prompt: Optional additional instructions to append to the prompt.
+            template: Optional card formatting template (e.g., "basic", "detailed").
+            
+        Returns:
+            One list of card dicts per input document, in the same order.
+        """
+        base_prompt = self._qa_prompt(deck_type, custom_prompt, template)
+        cache_paths = [
+            self._cache_path("cards", pdf_bytes, base_prompt) for pdf_bytes in pdf_bytes_list
+        ]
+        results: List[Optional[List[Dict]]] = []
+        for cache_path in cache_paths:
+            cached = self._cache_load(cache_path)
+            results.append(cached if isinstance(cached, list) else None)
+        missing = [i for i, cards in enumerate(results) if cards is None]
+        
+        if len(missing) == 1:
+            i = missing[0]
+            results[i] = self.generate_qa_cards(deck_type, pdf_bytes_list[i], custom_prompt, template)
+        elif missing:
+            prompt = build_batch_prompt(base_prompt, len(missing))
+            contents = [self._pdf_part(pdf_bytes_list[i]) for i in missing]
+            contents.append(prompt)
+            
+            response = self.client.models.generate_content(model=self.model, contents=contents)
+            
+            documents = self._batch_documents(self._extract_json(response.text), len(missing))
+            for i, doc in zip(missing, documents):
+                if doc is None:
+                    results[i] = self.generate_qa_cards(deck_type, pdf_bytes_list[i], custom_prompt, template)
+                    continue
+                cards = _parse_cards(doc)
+                if cards:
+                    self._cache_store(cache_paths[i], cards)
+                results[i] = cards
+        return results
+    
+    def _combined_prompt(self, custom_prompt: Optional[str], template: Optional[str]) -> str:
+        """Build the classify-and-generate prompt with any custom instructions."""
+        prompt = build_combined_prompt(self.config.name, self.config.deck_types, template=template)
+        if custom_prompt:
+            prompt = f"{prompt}\n\nAdditional instructions: {custom_prompt}"
+        return prompt
+    
+    @staticmethod
+    def _batch_documents(data: Any, count: int) -> List[Optional[dict]]:
+        """Return exactly count per-document objects from a batch response.
+        
+        Accepts {"documents": [...]} or a bare list of documents. Documents
+        the model left out, or that aren't objects, are None so the caller
+        can retry them on their own.
+        """
+        documents = data.get("documents") if isinstance(data, dict) else data
+        if not isinstance(documents, list):
+            documents = []
+        results: List[Optional[dict]] = [
+            doc if isinstance(doc, dict) else None for doc in documents[:count]
+        ]
+        results.extend(None for _ in range(count - len(results)))
+        return results
@@ -4,21 +4,27 @@ Main PDF to Anki card generator.
 Orchestrates the full pipeline from PDF to Anki deck.
 """
 
-import sys
-from pathlib import Path
-from typing import Optional, Dict
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
+from typing import Callable, Optional, Dict, List, Tuple
 
 from anki_generator import AnkiGenerator, SUPPORTED_LANGUAGES
 
-from .pdf_processor import extract_pages_as_pdf
-from .gemini_client import GeminiClient
+from .pdf_processor import extract_pages_as_pdf, heuristic_classify, RANGE_CACHE_DIR
+from .gemini_client import GeminiClient, CACHE_DIR
 from .deck_registry import DeckRegistry
+from .deck_output import DeckOutputMixin
+
+# Upper bound on concurrent Gemini requests per run
+_MAX_WORKERS = 4
+# Upper bound on page ranges in flight in agenerate_ranges()
+_MAX_CONCURRENT_RANGES = 10
+# card dict -> (question, answer)
+_qa_pair = itemgetter("question", "answer")
 
 
-class PDFCardGenerator:
+class PDFCardGenerator(DeckOutputMixin):
     """Main orchestration class for generating Anki cards from PDFs.
     
     This class:
@@ -35,7 +41,12 @@ class PDFCardGenerator:
         model: str = "gemini-2.0-flash",
         language: str = "german",
         output_file: Optional[str] = None,
-        registry_path: str = "deck_registry.json"
+        registry_path: str = "deck_registry.json",
+        use_cache: bool = False,
+        local_classify: bool = False,
+        background_export: bool = False,
+        context_cache: bool = False,
+        combined: bool = False
     ):
         """Initialize the PDF card generator.
         
@@ -45,17 +56,48 @@ class PDFCardGenerator:
             language: Target language (e.g., "german", "chinese").
             output_file: Path to the output .apkg file.
             registry_path: Path to the deck registry JSON file.
+            use_cache: Whether to keep page extracts and Gemini responses on
+                disk (under .cache/ and .gemini_cache/) and reuse them for
+                pages processed before with the same model and prompt.
+            local_classify: Whether to classify clear-cut pages from their
+                text layer instead of asking Gemini. The local answer is
+                used unchecked, so this is off by default.
+            background_export: Whether to write .apkg files on a background
+                thread so the next generate call can start right away. Call
+                close() to wait for pending exports.
+            context_cache: Whether to keep card prompts in Gemini's context
+                cache instead of resending them with every request.
+            combined: Whether generate_from_pdf() classifies and generates
+                unclassified pages in one request. The combined prompt carries
+                every deck type's instructions, so by default the pages are
+                classified first and then sent with the focused prompt.
         """
         self._is_default_output = output_file is None
+        self._local_classify = local_classify
+        self._combined = combined
+        self._range_cache_dir = RANGE_CACHE_DIR if use_cache else None
         self.output_file = output_file or f"{language}_learning_deck.apkg"
         
         # Get language config
         lang_key = language.lower()
         self._config = SUPPORTED_LANGUAGES.get(lang_key, SUPPORTED_LANGUAGES["german"])
         
-        self.gemini = GeminiClient(config=self._config, api_key=api_key, model=model)
+        self.gemini = GeminiClient(
+            config=self._config,
+            api_key=api_key,
+            model=model,
+            cache_dir=CACHE_DIR if use_cache else None,
+            context_cache=context_cache
+        )
         self.registry = DeckRegistry(registry_path=registry_path)
         self.anki = AnkiGenerator(self._config)
+        
+        # Single worker keeps exports in order; created on first use
+        self._background_export = background_export
+        self._export_pool: Optional[ThreadPoolExecutor] = None
+        self._pending_exports: List[Future] = []
+        
+        self._init_deck_types()
     
     def generate_from_pdf(
         self,
@@ -82,15 +124,11 @@ class PDFCardGenerator:
                 - content_type: "grammar" or "vocabulary"
                 - category: Category name (for vocabulary) or None
                 - cards_generated: Number of cards generated
+                - cards_added: How many of them were new to the deck
                 - deck_action: "extended" or "created"
         """
         if content_type:
-            content_type = content_type.lower()
-            if content_type not in self._config.deck_type_names:
-                raise ValueError(
-                    f"Invalid content type '{content_type}' for {self._config.name}. "
-                    f"Valid types: {', '.join(self._config.deck_type_names)}"
-                )
+            content_type = self._validate_content_type(content_type)
             if verbose:
                 print(f"🔍 Using provided content type: {content_type.upper()}")
 
@@ -98,46 +136,228 @@ class PDFCardGenerator:
             print(f"📄 Extracting pages {start_page}-{end_page} from PDF...")
         
         # Step 1: Extract pages as PDF bytes
-        pdf_bytes = extract_pages_as_pdf(pdf_path, start_page, end_page)
+        pdf_bytes = extract_pages_as_pdf(
+            pdf_path, start_page, end_page, cache_dir=self._range_cache_dir
+        )
         
         if verbose:
             print(f"📝 Extracted {len(pdf_bytes)} bytes ({end_page - start_page + 1} pages)")
         
         # Step 2: Classify content (skip if provided)
+        cards = None
         if not content_type:
             if verbose:
                 print("🔍 Classifying content type...")
-            content_type = self.gemini.classify_content(pdf_bytes)
+            if self._local_classify:
+                content_type = heuristic_classify(pdf_bytes, self._config.deck_types)
+            if not content_type:
+                if self._combined:
+                    # One request that classifies and generates at the same time
+                    content_type, cards = self.gemini.classify_and_generate(pdf_bytes, template=template)
+                else:
+                    content_type = self.gemini.classify_content(pdf_bytes)
             if verbose:
                 print(f"   → Detected: {content_type.upper()}")
         
         # Step 3 & 4: Generate cards and update decks
-        deck_type = self._config.get_deck_type(content_type)
-        if deck_type is None:
-            deck_type = content_type.title()
-        result = self._handle_qa_type(deck_type, pdf_bytes, verbose, template=template)
+        deck_type = self._resolve_deck_type(content_type)
+        result = self._handle_qa_type(deck_type, pdf_bytes, verbose, template=template, cards=cards)
+        
+        # Step 5: Export
+        self._export([deck_type], verbose)
+        
+        if verbose:
+            print(f"✅ Done! Generated {result['cards_generated']} cards, {result['cards_added']} new")
+        
+        return result
+    
+    def generate_from_pdf_ranges(
+        self,
+        pdf_path: str,
+        ranges: List[Tuple[int, int]],
+        content_type: Optional[str] = None,
+        verbose: bool = True,
+        template: Optional[str] = None
+    ) -> dict:
+        """Generate cards from several page ranges of a PDF in batched requests.
+        
+        Ranges of the same deck type share a single Gemini generation call.
         
-        # Step 5: Determine export path
-        output_dir = Path("generated_cards") / self._config.name / deck_type.lower()
-        output_dir.mkdir(parents=True, exist_ok=True)
+        Args:
+            pdf_path: Path to the PDF file.
+            ranges: List of (start_page, end_page) tuples (1-indexed, inclusive).
+                Must not be empty.
+            content_type: Optional. Applies to every range and skips classification.
+            verbose: Whether to print progress messages.
+            template: Optional card formatting template (e.g., "basic", "detailed").
+            
+        Returns:
+            A summary dict with:
+                - deck_counts: Cards generated per deck type
+                - cards_generated: Total number of cards generated
+                - cards_added: How many of them were new to their decks
+        """
+        self._validate_ranges(ranges)
+        if content_type:
+            content_type = self._validate_content_type(content_type)
         
-        if self._is_default_output:
-            self.output_file = str(output_dir / f"{self._config.name}_{deck_type}.apkg")
+        # PyMuPDF documents are not thread-safe, so extraction stays sequential
+        pdf_list = []
+        for start_page, end_page in ranges:
+            if verbose:
+                print(f"📄 Extracting pages {start_page}-{end_page} from PDF...")
+            pdf_list.append(extract_pages_as_pdf(
+                pdf_path, start_page, end_page, cache_dir=self._range_cache_dir
+            ))
+        
+        if content_type:
+            range_types = [content_type] * len(pdf_list)
         else:
-            out_path = Path(self.output_file)
-            if str(out_path.parent) == ".":
-                self.output_file = str(output_dir / self.output_file)
+            range_types = classify_ranges(self.gemini, pdf_list, self._local_classify)
+            if verbose:
+                for (start_page, end_page), range_type in zip(ranges, range_types):
+                    print(f"   → Pages {start_page}-{end_page}: {range_type.upper()}")
+        deck_types = [self._resolve_deck_type(range_type) for range_type in range_types]
+        
         if verbose:
-            print(f"💾 Exporting to {self.output_file}...")
+            print(f"📚 Generating cards for {len(pdf_list)} range(s), one request per deck type...")
+        batches = generate_ranges_batched(self.gemini, pdf_list, deck_types, template=template)
+        
+        # Merge the ranges of each deck type, preserving first-seen order
+        grouped: Dict[str, List[Dict]] = {}
+        for deck_type, cards in zip(deck_types, batches):
+            grouped.setdefault(deck_type, []).extend(cards)
+        
+        # AnkiGenerator isn't thread-safe, so cards are added on this thread
+        deck_counts = {}
+        added = 0
+        for deck_type, cards in grouped.items():
+            added += self.anki.extend_qa_cards(deck_type, map(_qa_pair, cards))
+            deck_counts[deck_type] = len(cards)
+            if verbose:
+                print(f"   → Generated {len(cards)} {deck_type.lower()} cards")
         
-        self.anki.export(self.output_file)
+        self._export(list(deck_counts), verbose)
         
+        total = sum(deck_counts.values())
         if verbose:
-            print(f"✅ Done! Generated {result['cards_generated']} cards")
+            print(f"✅ Done! Generated {total} cards, {added} new")
         
-        return result
+        return {"deck_counts": deck_counts, "cards_generated": total, "cards_added": added}
     
-    def _handle_qa_type(self, deck_type: str, pdf_bytes: bytes, verbose: bool, template: Optional[str] = None) -> dict:
+    def generate_from_pdf_batches(
+        self,
+        pdf_path: str,
+        ranges: List[Tuple[int, int]],
+        content_type: Optional[str] = None,
+        verbose: bool = True,
+        template: Optional[str] = None
+    ) -> dict:
+        """Generate cards from several page ranges with concurrent per-range requests.
+        
+        Unlike generate_from_pdf_ranges(), every range keeps its own
+        classification and generation requests, so one bad range cannot
+        spoil a shared batch response. Up to 10 ranges are in flight at once.
+        
+        Args:
+            pdf_path: Path to the PDF file.
+            ranges: List of (start_page, end_page) tuples (1-indexed, inclusive).
+                Must not be empty.
+            content_type: Optional. Applies to every range and skips classification.
+            verbose: Whether to print progress messages.
+            template: Optional card formatting template (e.g., "basic", "detailed").
+            
+        Returns:
+            A summary dict with:
+                - deck_counts: Cards generated per deck type
+                - cards_generated: Total number of cards generated
+                - cards_added: How many of them were new to their decks
+        """
+        self._validate_ranges(ranges)
+        if content_type:
+            content_type = self._validate_content_type(content_type)
+        
+        # PyMuPDF isn't thread-safe: extract and pre-classify on this thread
+        pdf_list = []
+        range_types = []
+        for start_page, end_page in ranges:
+            if verbose:
+                print(f"📄 Extracting pages {start_page}-{end_page} from PDF...")
+            pdf_bytes = extract_pages_as_pdf(
+                pdf_path, start_page, end_page, cache_dir=self._range_cache_dir
+            )
+            pdf_list.append(pdf_bytes)
+            range_type = content_type
+            if not range_type and self._local_classify:
+                range_type = heuristic_classify(pdf_bytes, self._config.deck_types)
+            range_types.append(range_type)
+        
+        if verbose:
+            print(f"📚 Processing {len(ranges)} range(s) concurrently...")
+        results = asyncio.run(agenerate_ranges(
+            self.gemini, pdf_list, range_types, self._resolve_deck_type, template=template
+        ))
+        
+        # AnkiGenerator isn't thread-safe, so cards are added on this thread
+        deck_counts: Dict[str, int] = {}
+        added = 0
+        for (start_page, end_page), (deck_type, cards) in zip(ranges, results):
+            if verbose:
+                print(f"   → Pages {start_page}-{end_page}: {len(cards)} {deck_type.lower()} cards")
+            added += self.anki.extend_qa_cards(
+                deck_type, map(_qa_pair, cards)
+            )
+            deck_counts[deck_type] = deck_counts.get(deck_type, 0) + len(cards)
+        
+        self._export(list(deck_counts), verbose)
+        
+        total = sum(deck_counts.values())
+        if verbose:
+            print(f"✅ Done! Generated {total} cards, {added} new")
+        
+        return {"deck_counts": deck_counts, "cards_generated": total, "cards_added": added}
+    
+    def close(self) -> None:
+        """Finish pending background exports and delete uploaded PDFs.
+        
+        Raises:
+            Exception: The first error raised by a background export.
+        """
+        try:
+            pending, self._pending_exports = self._pending_exports, []
+            for future in pending:
+                future.result()
+        finally:
+            if self._export_pool is not None:
+                self._export_pool.shutdown()
+                self._export_pool = None
+            self.gemini.release_uploads()
+    
+    def __enter__(self) -> "PDFCardGenerator":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def _write_deck(self) -> None:
+        """Export the decks, on the background thread if background_export is set."""
+        if self._background_export:
+            if self._export_pool is None:
+                self._export_pool = ThreadPoolExecutor(max_workers=1)
+            self._pending_exports.append(
+                self._export_pool.submit(self.anki.export, self.output_file)
+            )
+        else:
+            self.anki.export(self.output_file)
+    
+    def _handle_qa_type(
+        self,
+        deck_type: str,
+        pdf_bytes: bytes,
+        verbose: bool,
+        template: Optional[str] = None,
+        cards: Optional[List[Dict]] = None
+    ) -> dict:
         """Handle Q&A content: generate cards and add to the appropriate deck.
         
         Args:
@@ -145,36 +365,177 @@ class PDFCardGenerator:
             pdf_bytes: The PDF pages as bytes.
             verbose: Whether to print progress messages.
             template: Optional card formatting template (e.g., "basic", "detailed").
+            cards: Cards already generated for this deck type, if any.
             
         Returns:
-            Summary dict with content_type and cards_generated.
+            Summary dict with content_type, cards_generated and cards_added
+            (those not already in the deck).
         """
         if verbose:
             print(f"📚 Generating {deck_type.lower()} cards...")
         
-        cards = self.gemini.generate_qa_cards(deck_type, pdf_bytes, template=template)
+        if cards is None:
+            cards = self.gemini.generate_qa_cards(deck_type, pdf_bytes, template=template)
         
         if verbose:
             print(f"   → Generated {len(cards)} {deck_type.lower()} cards")
         
-        # Ensure deck exists and add cards
-        self.anki.create_qa_deck(deck_type)
-        
-        for card in cards:
-            self.anki.add_qa_card(
-                deck_type=deck_type,
-                question=card["question"],
-                answer=card["answer"]
-            )
+        # Add all cards in one call (creates the deck if needed)
+        cards_added = self.anki.extend_qa_cards(
+            deck_type, map(_qa_pair, cards)
+        )
         
         return {
             "content_type": deck_type.lower(),
             "category": None,
             "cards_generated": len(cards),
+            "cards_added": cards_added,
         }
     
 
 
+def classify_ranges(
+    gemini: GeminiClient,
+    pdf_list: List[bytes],
+    local_classify: bool
+) -> List[str]:
+    """Classify every PDF, through Gemini in parallel where needed.
+    
+    Args:
+        gemini: The client to classify with.
+        pdf_list: The PDF documents as bytes, one per page range.
+        local_classify: Whether to try heuristic_classify() first.
+        
+    Returns:
+        One lowercase content type per PDF, in the same order.
+    """
+    # PyMuPDF isn't thread-safe, so the heuristic runs on this thread
+    range_types: List[Optional[str]] = [None] * len(pdf_list)
+    if local_classify:
+        range_types = [
+            heuristic_classify(pdf_bytes, gemini.config.deck_types)
+            for pdf_bytes in pdf_list
+        ]
+    unresolved = [i for i, range_type in enumerate(range_types) if not range_type]
+    if unresolved:
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+            detected = pool.map(gemini.classify_content, [pdf_list[i] for i in unresolved])
+            for i, range_type in zip(unresolved, detected):
+                range_types[i] = range_type
+    return range_types
+
+
+def generate_ranges_batched(
+    gemini: GeminiClient,
+    pdf_list: List[bytes],
+    deck_types: List[str],
+    custom_prompt: Optional[str] = None,
+    template: Optional[str] = None
+) -> List[List[Dict]]:
+    """Generate cards for every PDF with one batch request per deck type.
+    
+    PDFs of the same deck type share a generate_qa_cards_batch() call;
+    the calls for different deck types are in flight at once.
+    
+    Args:
+        gemini: The client to generate with.
+        pdf_list: The PDF documents as bytes, one per page range.
+        deck_types: The deck type name of each PDF.
+        custom_prompt: Optional additional instructions to append to the prompt.
+        template: Optional card formatting template (e.g., "basic", "detailed").
+        
+    Returns:
+        One list of card dicts per PDF, in the same order.
+    """
+    # Deck type -> indexes of its PDFs, preserving first-seen order
+    groups: Dict[str, List[int]] = {}
+    for i, deck_type in enumerate(deck_types):
+        groups.setdefault(deck_type, []).append(i)
+    
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+        futures = {
+            deck_type: pool.submit(
+                gemini.generate_qa_cards_batch,
+                deck_type, [pdf_list[i] for i in indexes], custom_prompt, template
+            )
+            for deck_type, indexes in groups.items()
+        }
+    
+    results: List[List[Dict]] = [[] for _ in pdf_list]
+    for deck_type, indexes in groups.items():
+        for i, cards in zip(indexes, futures[deck_type].result()):
+            results[i] = cards
+    return results
+
+
+async def agenerate_ranges(
+    gemini: GeminiClient,
+    pdf_list: List[bytes],
+    range_types: List[Optional[str]],
+    resolve_deck_type: Callable[[str], str],
+    custom_prompt: Optional[str] = None,
+    template: Optional[str] = None
+) -> List[Tuple[str, List[Dict]]]:
+    """Classify (where no type is known) and generate every PDF through the async client.
+    
+    Each PDF keeps its own requests, so one bad range cannot spoil a
+    shared batch response. Up to 10 PDFs are in flight at once. The
+    client's async transport is closed before returning, so this can run
+    under a fresh asyncio.run() each time.
+    
+    Args:
+        gemini: The client to send requests with.
+        pdf_list: The PDF documents as bytes, one per page range.
+        range_types: Lowercase content type of each PDF, or None to classify it.
+        resolve_deck_type: Maps a content type to its deck type name.
+        custom_prompt: Optional additional instructions to append to the prompt.
+        template: Optional card formatting template (e.g., "basic", "detailed").
+        
+    Returns:
+        (deck_type, cards) per PDF, in input order.
+    """
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_RANGES)
+    
+    async def process(pdf_bytes: bytes, range_type: Optional[str]) -> Tuple[str, List[Dict]]:
+        async with semaphore:
+            if not range_type:
+                range_type = await gemini.aclassify_content(pdf_bytes)
+            deck_type = resolve_deck_type(range_type)
+            cards = await gemini.agenerate_qa_cards(
+                deck_type, pdf_bytes, custom_prompt=custom_prompt, template=template
+            )
+            return deck_type, cards
+    
+    try:
+        return await asyncio.gather(
+            *(process(pdf_bytes, range_type) for pdf_bytes, range_type in zip(pdf_list, range_types))
+        )
+    finally:
+        await gemini.aclose()
+
+
+def parse_page_ranges(value: str) -> List[Tuple[int, int]]:
+    """Parse a page range list such as "1-10,11-20,25" into (start, end) tuples.
+    
+    Raises:
+        argparse.ArgumentTypeError: If a range is malformed, starts before
+            page 1 or ends before it starts.
+    """
+    import argparse
+    
+    ranges = []
+    for part in value.split(","):
+        start, sep, end = part.strip().partition("-")
+        try:
+            page_range = (int(start), int(end) if sep else int(start))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid page range: '{part}'")
+        if page_range[0] < 1 or page_range[1] < page_range[0]:
+            raise argparse.ArgumentTypeError(f"Invalid page range: '{part}'")
+        ranges.append(page_range)
+    return ranges
+
+
 def main():
     """CLI entry point for the PDF card generator."""
     import argparse
@@ -184,8 +545,13 @@ def main():
         description="Generate Anki cards from German textbook PDFs using Gemini AI"
     )
     parser.add_argument("pdf_path", help="Path to the PDF file")
-    parser.add_argument("start_page", type=int, help="Starting page number (1-indexed)")
-    parser.add_argument("end_page", type=int, help="Ending page number (1-indexed)")
+    parser.add_argument("start_page", type=int, nargs="?", help="Starting page number (1-indexed)")
+    parser.add_argument("end_page", type=int, nargs="?", help="Ending page number (1-indexed)")
+    parser.add_argument(
+        "--ranges",
+        type=parse_page_ranges,
+        help="Comma-separated page ranges batched into one request per deck type (e.g. 1-10,11-20)"
+    )
     parser.add_argument(
         "-l", "--language",
         choices=list(SUPPORTED_LANGUAGES.keys()),
@@ -221,27 +587,82 @@ def main():
         help=f"Card formatting template to use (e.g. {', '.join(CARD_TEMPLATES.keys())})"
     )
     
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=f"Reuse page extracts and Gemini responses cached in {RANGE_CACHE_DIR}/ and {CACHE_DIR}/"
+    )
+    parser.add_argument(
+        "--no-batch",
+        action="store_true",
+        help="With --ranges, send concurrent requests per range instead of one batched request per deck type"
+    )
+    parser.add_argument(
+        "--heuristic",
+        action="store_true",
+        help="Classify clear-cut pages locally from their text instead of asking Gemini"
+    )
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="Without --type, classify and generate in one Gemini request instead of two"
+    )
+    parser.add_argument(
+        "--context-cache",
+        action="store_true",
+        help="Cache card prompts on the Gemini side to save prompt tokens on repeated requests"
+    )
+    
     args = parser.parse_args()
+    if not args.ranges and (args.start_page is None or args.end_page is None):
+        parser.error("start_page and end_page are required unless --ranges is given")
     
     generator = PDFCardGenerator(
         model=args.model,
         language=args.language,
         output_file=args.output,
-        registry_path=args.registry
+        registry_path=args.registry,
+        use_cache=args.cache,
+        local_classify=args.heuristic,
+        context_cache=args.context_cache,
+        combined=args.combined
     )
     
-    result = generator.generate_from_pdf(
-        pdf_path=args.pdf_path,
-        start_page=args.start_page,
-        end_page=args.end_page,
-        content_type=args.type,
-        verbose=not args.quiet,
-        template=args.template
-    )
-    
-    print(f"\nSummary:")
-    print(f"  Content type: {result['content_type']}")
-    print(f"  Cards generated: {result['cards_generated']}")
+    try:
+        if args.ranges:
+            generate = (
+                generator.generate_from_pdf_batches if args.no_batch
+                else generator.generate_from_pdf_ranges
+            )
+            result = generate(
+                pdf_path=args.pdf_path,
+                ranges=args.ranges,
+                content_type=args.type,
+                verbose=not args.quiet,
+                template=args.template
+            )
+            
+            print(f"\nSummary:")
+            for deck, count in result['deck_counts'].items():
+                print(f"  {deck} cards: {count}")
+            print(f"  Cards generated: {result['cards_generated']}")
+            print(f"  Cards added: {result['cards_added']}")
+        else:
+            result = generator.generate_from_pdf(
+                pdf_path=args.pdf_path,
+                start_page=args.start_page,
+                end_page=args.end_page,
+                content_type=args.type,
+                verbose=not args.quiet,
+                template=args.template
+            )
+            
+            print(f"\nSummary:")
+            print(f"  Content type: {result['content_type']}")
+            print(f"  Cards generated: {result['cards_generated']}")
+            print(f"  Cards added: {result['cards_added']}")
+    finally:
+        generator.close()
 
 
 if __name__ == "__main__":
@@ -4,19 +4,49 @@ PDF processing module.
 Handles extracting specific pages from PDF files for Gemini processing.
 """
 
+import atexit
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
 import fitz  # PyMuPDF
 
+# Location of cached page-range extracts when the CLI's --cache is given
+RANGE_CACHE_DIR = Path(".cache") / "pdf_ranges"
+# Least recently used extracts are evicted beyond this total size
+RANGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Source documents kept open between extractions, most recently used last.
+# Keyed by resolved path; the stored (mtime_ns, size) detects edited files.
+_SOURCE_DOCS: "OrderedDict[str, Tuple[int, int, fitz.Document]]" = OrderedDict()
+_SOURCE_DOCS_MAX = 4
+# A PyMuPDF document must not be used from two threads at once
+_SOURCE_DOCS_LOCK = threading.Lock()
+
 
-def extract_pages_as_pdf(pdf_path: str, start_page: int, end_page: int) -> bytes:
+def extract_pages_as_pdf(
+    pdf_path: str,
+    start_page: int,
+    end_page: int,
+    cache_dir: Optional[Path] = None
+) -> bytes:
     """Extract specified pages from a PDF and return as PDF bytes.
     
-    This creates a new PDF containing only the specified pages,
+    This creates a PDF containing only the specified pages,
     which can be passed directly to Gemini's API.
     
     Args:
         pdf_path: Path to the PDF file.
         start_page: Starting page number (1-indexed, inclusive).
         end_page: Ending page number (1-indexed, inclusive).
+        cache_dir: Optional directory for cached extracts (e.g.
+            RANGE_CACHE_DIR), keyed by the source file's path, modification
+            time and the page range. By default pages are always extracted
+            and nothing is written to disk.
     
     Returns:
         The extracted pages as PDF bytes.
@@ -25,30 +55,109 @@ def extract_pages_as_pdf(pdf_path: str, start_page: int, end_page: int) -> bytes
         FileNotFoundError: If the PDF file doesn't exist.
         ValueError: If page numbers are invalid.
     """
-    doc = fitz.open(pdf_path)
+    if cache_dir is None:
+        return _extract_pages(pdf_path, start_page, end_page)
     
+    stat = os.stat(pdf_path)
+    key = f"{Path(pdf_path).resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{start_page}|{end_page}"
+    cache_path = Path(cache_dir) / f"{hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()}.pdf"
+    try:
+        pdf_bytes = cache_path.read_bytes()
+        os.utime(cache_path)  # Mark as recently used for eviction
+        return pdf_bytes
+    except FileNotFoundError:
+        pass
+    
+    pdf_bytes = _extract_pages(pdf_path, start_page, end_page)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    tmp_path.write_bytes(pdf_bytes)
+    os.replace(tmp_path, cache_path)
+    _evict_range_cache(cache_path.parent)
+    return pdf_bytes
+
+
+def _evict_range_cache(cache_dir: Path, max_bytes: int = RANGE_CACHE_MAX_BYTES) -> None:
+    """Delete least recently used extracts until the cache fits in max_bytes."""
+    entries = []
+    total = 0
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".pdf"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+            total += stat.st_size
+    if total <= max_bytes:
+        return
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        if total <= max_bytes:
+            break
+
+
+def _source_doc(pdf_path: str) -> "fitz.Document":
+    """Return an open document for pdf_path, reusing a previous handle.
+    
+    Opening parses the xref and page tree, which is the bulk of the work
+    when several ranges are cut from the same textbook. Must be called
+    with _SOURCE_DOCS_LOCK held.
+    """
+    key = os.path.realpath(pdf_path)
+    stat = os.stat(key)
+    cached = _SOURCE_DOCS.get(key)
+    if cached is not None:
+        mtime_ns, size, doc = cached
+        if mtime_ns == stat.st_mtime_ns and size == stat.st_size:
+            _SOURCE_DOCS.move_to_end(key)
+            return doc
+        del _SOURCE_DOCS[key]
+        doc.close()
+    
+    doc = fitz.open(key)
+    _SOURCE_DOCS[key] = (stat.st_mtime_ns, stat.st_size, doc)
+    while len(_SOURCE_DOCS) > _SOURCE_DOCS_MAX:
+        _, (_, _, old_doc) = _SOURCE_DOCS.popitem(last=False)
+        old_doc.close()
+    return doc
+
+
+@atexit.register
+def close_source_docs() -> None:
+    """Close the source documents kept open by extract_pages_as_pdf()."""
+    with _SOURCE_DOCS_LOCK:
+        while _SOURCE_DOCS:
+            _, (_, _, doc) = _SOURCE_DOCS.popitem()
+            doc.close()
+
+
+def _extract_pages(pdf_path: str, start_page: int, end_page: int) -> bytes:
+    """Extract pages with PyMuPDF; see extract_pages_as_pdf()."""
     # Validate page numbers
     if start_page < 1:
         raise ValueError("start_page must be at least 1")
-    if end_page > len(doc):
-        raise ValueError(f"end_page ({end_page}) exceeds document pages ({len(doc)})")
     if start_page > end_page:
         raise ValueError("start_page must be less than or equal to end_page")
     
-    # Create new PDF with only the specified pages
-    new_doc = fitz.open()  # Empty PDF
-    
-    # PyMuPDF uses 0-indexed pages
-    for page_num in range(start_page - 1, end_page):
-        new_doc.insert_pdf(doc, from_page=page_num, to_page=page_num)
-    
-    # Get as bytes
-    pdf_bytes = new_doc.tobytes()
-    
-    new_doc.close()
-    doc.close()
-    
-    return pdf_bytes
+    with _SOURCE_DOCS_LOCK:
+        src = _source_doc(pdf_path)
+        page_count = len(src)
+        if end_page > page_count:
+            raise ValueError(f"end_page ({end_page}) exceeds document pages ({page_count})")
+        
+        # Copy the pages into a fresh document so the shared source stays
+        # intact for the next range (PyMuPDF uses 0-indexed pages).
+        doc = fitz.open()
+        try:
+            doc.insert_pdf(src, from_page=start_page - 1, to_page=end_page - 1)
+            # Drop unused/duplicate objects and compress streams to shrink the
+            # upload. No random trailer /ID, so the same pages always give the
+            # same bytes and the content-addressed response cache can hit.
+            return doc.tobytes(garbage=4, deflate=True, no_new_id=True)
+        finally:
+            doc.close()
 
 
 def get_pdf_page_count(pdf_path: str) -> int:
@@ -60,7 +169,90 @@ def get_pdf_page_count(pdf_path: str) -> int:
     Returns:
         The number of pages in the PDF.
     """
-    doc = fitz.open(pdf_path)
-    count = len(doc)
-    doc.close()
-    return count
+    with _SOURCE_DOCS_LOCK:
+        return len(_source_doc(pdf_path))
+
+
+# "word - translation" style lines that make up vocabulary lists: a few
+# words on each side and no sentence punctuation at the end. Colons are not
+# separators, since "Beispiel: ..." and "Regel: ..." lines fill grammar pages.
+_VOCAB_TERM = r"[\w'(),.]+(?: [\w'(),.]+){0,3}"
+_VOCAB_LINE_RE = re.compile(rf"^\s*(?!.*[.!?]\s*$){_VOCAB_TERM}\s*[-–—=]\s*{_VOCAB_TERM}\s*$")
+
+# Terms that mark pages as a specific non-vocabulary deck type
+_DECK_TYPE_KEYWORDS = {
+    "grammar": (
+        "grammatik", "konjugation", "deklination", "präteritum", "perfekt",
+        "plusquamperfekt", "konjunktiv", "nominativ", "akkusativ", "dativ",
+        "genitiv", "grammar", "conjugation", "declension",
+    ),
+    "radicals": ("部首", "radical", "radicals", "偏旁"),
+}
+_CJK_RE = re.compile(r"[\u3400-\u9fff]")
+
+
+def _keyword_re(keywords: Sequence[str]) -> "re.Pattern":
+    """Match whole keywords, so "perfekt" doesn't count inside "plusquamperfekt".
+    
+    Chinese text has no spaces between words, so CJK terms match anywhere.
+    """
+    parts = [
+        re.escape(keyword) if _CJK_RE.search(keyword) else rf"\b{re.escape(keyword)}\b"
+        for keyword in keywords
+    ]
+    return re.compile("|".join(parts), re.IGNORECASE)
+
+
+_DECK_TYPE_KEYWORD_RES = {
+    deck_type: _keyword_re(keywords) for deck_type, keywords in _DECK_TYPE_KEYWORDS.items()
+}
+
+# Minimum share of list-style lines to call a page range vocabulary
+_VOCAB_LINE_RATIO = 0.7
+# Minimum keyword hits to call a page range a keyword deck type
+_KEYWORD_MIN_HITS = 3
+# Fewer text lines than this is too little to judge (e.g. scanned pages)
+_MIN_LINES = 5
+
+
+def heuristic_classify(pdf_bytes: bytes, deck_types: Sequence[str]) -> Optional[str]:
+    """Classify obvious page ranges locally from their text layer.
+    
+    Used to skip the Gemini classification call when the answer is clear:
+    mostly "word - translation" lines are vocabulary, and repeated deck type
+    keywords (e.g. case or tense names for grammar) select that type.
+    
+    Args:
+        pdf_bytes: The PDF pages as bytes.
+        deck_types: The language's configured deck type names.
+    
+    Returns:
+        The lowercased deck type, or None if the pages are ambiguous or
+        have no extractable text.
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        text = "\n".join(page.get_text() for page in doc)
+    finally:
+        doc.close()
+    
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) < _MIN_LINES:
+        return None
+    configured = {dt.lower() for dt in deck_types}
+    
+    if "vocabulary" in configured:
+        vocab_lines = sum(1 for line in lines if _VOCAB_LINE_RE.match(line))
+        if vocab_lines / len(lines) >= _VOCAB_LINE_RATIO:
+            return "vocabulary"
+    
+    best_type, best_hits = None, 0
+    for deck_type, keyword_re in _DECK_TYPE_KEYWORD_RES.items():
+        if deck_type not in configured:
+            continue
+        hits = sum(1 for _ in keyword_re.finditer(text))
+        if hits > best_hits:
+            best_type, best_hits = deck_type, hits
+    if best_hits >= _KEYWORD_MIN_HITS:
+        return best_type
+    return None
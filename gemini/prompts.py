@@ -5,20 +5,13 @@ Contains language-specific prompts used to classify content and generate cards.
 These prompts are used alongside PDF content passed via Part.from_bytes().
 """
 
+from typing import Tuple
+
 
 # =============================================================================
 # German Prompts
 # =============================================================================
 
-CLASSIFICATION_PROMPT_DE = """You are analyzing a page from a German language learning textbook.
-
-Analyze the PDF content and determine if it is primarily:
-1. "grammar" - If it focuses on grammatical rules, verb conjugations, case endings, sentence structure, etc.
-2. "vocabulary" - If it focuses on teaching new words, usually organized by topic/theme (e.g., body parts, food, clothing)
-
-Respond with ONLY one word: either "grammar" or "vocabulary"."""
-
-
 GRAMMAR_CARD_PROMPT_DE = """You are creating Anki flashcards from German grammar content.
 
 Analyze the PDF content and create question-answer flashcard pairs.
@@ -105,15 +98,6 @@ Extract all vocabulary words from the PDF. Create natural, useful example senten
 # Chinese Prompts
 # =============================================================================
 
-CLASSIFICATION_PROMPT_ZH = """You are analyzing a page from a Chinese (Mandarin) language learning textbook.
-
-Analyze the PDF content and determine if it is primarily:
-1. "radicals" - If it focuses on Chinese radicals (部首), their meanings, stroke order, or how they combine to form characters
-2. "vocabulary" - If it focuses on teaching new words/characters, usually organized by topic/theme (e.g., food, family, travel)
-
-Respond with ONLY one word: either "radicals" or "vocabulary"."""
-
-
 RADICALS_CARD_PROMPT_ZH = """You are creating Anki flashcards from Chinese (Mandarin) radical (部首) content.
 
 Analyze the PDF content and create question-answer flashcard pairs about Chinese radicals.
@@ -168,15 +152,11 @@ DECK_TYPE_PROMPTS = {
 }
 
 
-def build_classification_prompt(language_name: str, deck_types: list) -> str:
-    """Auto-generate a classification prompt from the language's deck types.
-    
-    Args:
-        language_name: E.g., "German", "Chinese".
-        deck_types: List of deck type names (e.g., ["Vocabulary", "Grammar"]).
+def _classification_task(language_name: str, deck_types: list) -> Tuple[str, str]:
+    """Describe the classification task for the language's deck types.
     
     Returns:
-        A classification prompt string.
+        Tuple of (task description, quoted list of the allowed answers).
     """
     type_descriptions = []
     all_types_list = []
@@ -197,16 +177,38 @@ def build_classification_prompt(language_name: str, deck_types: list) -> str:
     else:
         all_types = all_types_list[0]
     
-    return (
+    task = (
         f"You are analyzing a page from a {language_name} language learning textbook.\n\n"
         f"Analyze the PDF content and determine if it is primarily:\n"
-        f"{type_list}\n\n"
-        f"Respond with ONLY one word: {all_types}."
+        f"{type_list}"
     )
+    return task, all_types
+
+
+def build_classification_prompt(language_name: str, deck_types: list) -> str:
+    """Auto-generate a classification prompt from the language's deck types.
+    
+    Args:
+        language_name: E.g., "German", "Chinese".
+        deck_types: List of deck type names (e.g., ["Vocabulary", "Grammar"]).
+    
+    Returns:
+        A classification prompt string.
+    """
+    task, all_types = _classification_task(language_name, deck_types)
+    return f"{task}\n\nRespond with ONLY one word: {all_types}."
 
 
 from .templates import CARD_TEMPLATES, DEFAULT_TEMPLATES
 
+# Every (language, deck type, template) prompt, composed once at import
+COMPOSED_PROMPTS = {
+    (language_name, deck_type, template): f"{base_prompt}\n\n{template_str}"
+    for (language_name, deck_type), base_prompt in DECK_TYPE_PROMPTS.items()
+    for template, template_str in CARD_TEMPLATES.items()
+}
+
+
 def get_deck_type_prompt(language_name: str, deck_type: str, template: str = None) -> str:
     """Get the Q&A prompt for a specific deck type.
     
@@ -222,23 +224,86 @@ def get_deck_type_prompt(language_name: str, deck_type: str, template: str = Non
         ValueError: If no prompt is defined for this language/deck_type combo,
                     or if an invalid template is requested.
     """
-    key = (language_name, deck_type.lower())
-    base_prompt = DECK_TYPE_PROMPTS.get(key)
-    if base_prompt is None:
+    deck_type = deck_type.lower()
+    if template is None:
+        template = DEFAULT_TEMPLATES.get(deck_type, "basic")
+    prompt = COMPOSED_PROMPTS.get((language_name, deck_type, template.lower()))
+    if prompt is not None:
+        return prompt
+    
+    if (language_name, deck_type) not in DECK_TYPE_PROMPTS:
         raise ValueError(
             f"No base prompt defined for language '{language_name}', "
             f"deck type '{deck_type}'. "
             f"Available: {list(DECK_TYPE_PROMPTS.keys())}"
         )
-        
-    if template is None:
-        template = DEFAULT_TEMPLATES.get(deck_type.lower(), "basic")
-        
-    template_str = CARD_TEMPLATES.get(template.lower())
-    if template_str is None:
+    raise ValueError(
+        f"Invalid template '{template}'. "
+        f"Available templates: {list(CARD_TEMPLATES.keys())}"
+    )
+
+
+def build_batch_prompt(prompt: str, document_count: int) -> str:
+    """Wrap a card prompt so one request covers several PDF documents.
+    
+    Args:
+        prompt: The single-document prompt from get_deck_type_prompt().
+        document_count: Number of PDF documents sent with the prompt.
+    
+    Returns:
+        A prompt asking for one card object per document, in order.
+    """
+    return (
+        f"{prompt}\n\n"
+        f"You are given {document_count} separate PDF documents. Apply the "
+        f"instructions above to each document independently.\n"
+        f'Respond with ONLY a JSON object of the form {{"documents": [...]}}, '
+        f"where the list has exactly {document_count} entries in the same order "
+        f"as the documents and each entry is a JSON object in the card format above."
+    )
+
+
+def build_combined_prompt(
+    language_name: str,
+    deck_types: list,
+    template: str = None
+) -> str:
+    """Build one prompt that classifies the PDF and generates its cards.
+    
+    The model picks the deck type itself and then follows only that deck
+    type's instructions, saving the separate classification request.
+    
+    Args:
+        language_name: E.g., "German", "Chinese".
+        deck_types: List of deck type names (e.g., ["Vocabulary", "Grammar"]).
+        template: Optional template name applied to every deck type.
+    
+    Returns:
+        A prompt asking for {"content_type": ..., "cards": [...]}.
+    
+    Raises:
+        ValueError: If none of the deck types has a card prompt defined.
+    """
+    sections = []
+    for dt in deck_types:
+        if (language_name, dt.lower()) not in DECK_TYPE_PROMPTS:
+            continue
+        sections.append(
+            f'=== Instructions if the content type is "{dt.lower()}" ===\n'
+            f"{get_deck_type_prompt(language_name, dt, template=template)}"
+        )
+    if not sections:
         raise ValueError(
-            f"Invalid template '{template}'. "
-            f"Available templates: {list(CARD_TEMPLATES.keys())}"
+            f"No base prompt defined for any deck type of language '{language_name}'."
         )
-        
-    return f"{base_prompt}\n\n{template_str}"
+    
+    task, all_types = _classification_task(language_name, deck_types)
+    instructions = "\n\n".join(sections)
+    return (
+        f"{task}\n\n"
+        f"Then create flashcards following ONLY the instructions for that content type.\n\n"
+        f"{instructions}\n\n"
+        f"=== Response format ===\n"
+        f'Respond with ONLY a JSON object with two keys: "content_type" (either {all_types}) '
+        f'and "cards" (the cards list in the format given for that content type).'
+    )
@@ -9,18 +9,78 @@ Supports:
 import warnings
 warnings.filterwarnings("ignore")
 
-import json
+import os
+import re
+import shlex
+import subprocess
 import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Tuple
 
 from anki_generator import AnkiGenerator, SUPPORTED_LANGUAGES
-from gemini.pdf_processor import extract_pages_as_pdf
-from gemini.gemini_client import GeminiClient
 from gemini.deck_registry import DeckRegistry
+from gemini.deck_output import DeckOutputMixin
+from gemini import jsonlib
 
+# google-genai, PyMuPDF and asyncio are imported on first PDF use, so JSON
+# imports and --help don't pay for them
+if TYPE_CHECKING:
+    from gemini.gemini_client import GeminiClient
 
-class CardGenerator:
+# Validated JSON imports by (resolved path, language), tagged with
+# (st_mtime_ns, st_size), most recently used last
+_JSON_CACHE: "OrderedDict[Tuple[Path, str], Tuple[int, int, Tuple[Dict[str, List[Tuple[str, str]]], List[str]]]]" = OrderedDict()
+_JSON_CACHE_MAX = 8
+
+# GeminiClients shared by CardGenerators with the same settings, and how
+# many generators hold each; the last one to let go releases its uploads
+_GEMINI_CLIENTS: Dict[Tuple[Any, ...], "GeminiClient"] = {}
+_GEMINI_CLIENT_USERS: Dict[Tuple[Any, ...], int] = {}
+_GEMINI_CLIENTS_LOCK = threading.Lock()
+
+# Fields every Q&A card in a JSON import must have, in reporting order
+_REQUIRED_QA_FIELDS = ("question", "answer")
+_REQUIRED_QA_FIELD_SET = frozenset(_REQUIRED_QA_FIELDS)
+# card dict -> (question, answer), in C instead of two subscripts per card
+_qa_pair = itemgetter(*_REQUIRED_QA_FIELDS)
+
+# Answers to "inspect cards?" -> review mode (see _ask_inspect_cards())
+_REVIEW_CHOICES = {"yes": "cards", "y": "cards", "no": None, "n": None, "editor": "editor", "e": "editor"}
+# Answers to "add this card?" during one-by-one review; Enter adds the card
+_CARD_ACTIONS = {"": "add", "yes": "add", "y": "add", "no": "skip", "n": "skip", "edit": "edit", "e": "edit"}
+
+# Card fields shown and editable during interactive review, with their labels
+_CARD_FIELDS = (("question", "❓ Question"), ("answer", "✅ Answer"))
+_SEPARATOR = "=" * 50
+
+# Header of the file opened for reviewing cards in an editor
+_REVIEW_HEADER = (
+    "# One card per line: question<TAB>answer. Delete a line to drop that card.\n"
+    "# Line breaks and tabs inside a field are written as \\n and \\t.\n"
+    "# Lines starting with # are ignored.\n"
+)
+_TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\n": "\\n", "\t": "\\t"})
+_TSV_UNESCAPE_RE = re.compile(r"\\([\\nt#])")
+_TSV_UNESCAPES = {"\\": "\\", "n": "\n", "t": "\t", "#": "#"}
+
+
+def _tsv_escape(text: str) -> str:
+    """Escape a card field for one line of the review file."""
+    text = text.translate(_TSV_ESCAPES)
+    # A leading # would make the line a comment
+    return "\\" + text if text.startswith("#") else text
+
+
+def _tsv_unescape(text: str) -> str:
+    """Reverse _tsv_escape()."""
+    return _TSV_UNESCAPE_RE.sub(lambda m: _TSV_UNESCAPES[m.group(1)], text)
+
+
+class CardGenerator(DeckOutputMixin):
     """Main orchestration class for generating Anki cards.
     
     Supports both:
@@ -35,7 +95,11 @@ class CardGenerator:
         language: str = "german",
         output_file: Optional[str] = None,
         registry_path: str = "deck_registry.json",
-        custom_prompt: Optional[str] = None
+        custom_prompt: Optional[str] = None,
+        use_cache: bool = False,
+        requests_per_second: Optional[float] = None,
+        local_classify: bool = False,
+        combined: bool = False
     ):
         """Initialize the card generator.
         
@@ -47,12 +111,28 @@ class CardGenerator:
             output_file: Path to the output .apkg file.
             registry_path: Path to the deck registry JSON file.
             custom_prompt: Optional additional instructions to pass to Gemini.
+            use_cache: Whether to keep page extracts and Gemini responses on
+                disk (under .cache/ and .gemini_cache/) and reuse them for
+                pages processed before with the same model and prompt.
+            requests_per_second: Optional cap on the rate of concurrent
+                Gemini requests (see agenerate_from_pdf()).
+            local_classify: Whether to classify clear-cut pages from their
+                text layer instead of asking Gemini. The local answer is
+                used unchecked, so this is off by default.
+            combined: Whether generate_from_pdf() classifies and generates
+                unclassified pages in one request. The combined prompt carries
+                every deck type's instructions, so by default the pages are
+                classified first and then sent with the focused prompt.
         """
         self._is_default_output = output_file is None
         self.output_file = output_file or f"{language}_learning_deck.apkg"
         self.model = model
         self.api_key = api_key
         self.custom_prompt = custom_prompt
+        self.use_cache = use_cache
+        self.requests_per_second = requests_per_second
+        self.local_classify = local_classify
+        self.combined = combined
         self.registry = DeckRegistry(registry_path=registry_path)
         
         # Get language config
@@ -60,15 +140,83 @@ class CardGenerator:
         self._config = SUPPORTED_LANGUAGES.get(lang_key, SUPPORTED_LANGUAGES["german"])
         
         self.anki = AnkiGenerator(self._config)
-        self._gemini: Optional[GeminiClient] = None
+        self._gemini: Optional["GeminiClient"] = None
+        self._gemini_key: Optional[Tuple[Any, ...]] = None
+        self._init_deck_types()
     
     @property
-    def gemini(self) -> GeminiClient:
+    def gemini(self) -> "GeminiClient":
         """Lazy initialization of Gemini client (only when needed for PDF)."""
         if self._gemini is None:
-            self._gemini = GeminiClient(config=self._config, api_key=self.api_key, model=self.model)
+            from gemini.gemini_client import GeminiClient, CACHE_DIR
+            
+            # Generators with the same settings share one client, so its
+            # uploads, context caches and rate limit carry over
+            key = (
+                self.api_key or os.environ.get("GEMINI_API_KEY"),
+                self.model,
+                self._config.name,
+                self.use_cache,
+                self.requests_per_second,
+            )
+            with _GEMINI_CLIENTS_LOCK:
+                client = _GEMINI_CLIENTS.get(key)
+                if client is None:
+                    client = _GEMINI_CLIENTS[key] = GeminiClient(
+                        config=self._config,
+                        api_key=self.api_key,
+                        model=self.model,
+                        cache_dir=CACHE_DIR if self.use_cache else None,
+                        requests_per_second=self.requests_per_second
+                    )
+                _GEMINI_CLIENT_USERS[key] = _GEMINI_CLIENT_USERS.get(key, 0) + 1
+            self._gemini_key = key
+            self._gemini = client
         return self._gemini
     
+    def _release_uploads(self) -> None:
+        """Delete the client's uploads, unless another generator shares the client.
+        
+        Runs in finally blocks, so it never creates a client: that could
+        raise in place of the error being handled.
+        """
+        gemini = self._gemini
+        if gemini is None:
+            return
+        with _GEMINI_CLIENTS_LOCK:
+            if _GEMINI_CLIENT_USERS.get(self._gemini_key, 0) > 1:
+                return
+        gemini.release_uploads()
+    
+    def close(self) -> None:
+        """Let go of the Gemini client and write pending registry changes.
+        
+        The last generator holding a shared client deletes its uploaded
+        PDFs and context caches. Generating methods already clean up after
+        themselves; this covers calls interrupted partway. The generator
+        stays usable.
+        """
+        try:
+            if self._gemini is not None:
+                client, self._gemini = self._gemini, None
+                key, self._gemini_key = self._gemini_key, None
+                with _GEMINI_CLIENTS_LOCK:
+                    users = _GEMINI_CLIENT_USERS.pop(key, 1) - 1
+                    if users:
+                        _GEMINI_CLIENT_USERS[key] = users
+                    else:
+                        _GEMINI_CLIENTS.pop(key, None)
+                if not users:
+                    client.release_uploads()
+        finally:
+            self.registry.flush()
+    
+    def __enter__(self) -> "CardGenerator":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
     # ==================== JSON Import ====================
     
     def generate_from_json(
@@ -103,16 +251,18 @@ class CardGenerator:
             
         Returns:
             A summary dict with:
-                - vocabulary_cards: Number of vocabulary cards generated
-                - grammar_cards: Number of grammar cards generated
-                - categories: List of vocabulary categories processed
+                - total_cards: Number of valid cards processed
+                - deck_counts: Cards processed per deck type
+                - cards_added: How many of them were new to their decks
+                - duplicates_skipped: Cards already in their deck (e.g.
+                  repeated in the file), which were not added again
                 - errors: List of validation errors (if any)
         """
         if verbose:
             print(f"📄 Loading cards from {json_path}...")
         
         # Load and validate JSON
-        data, errors = self._load_and_validate_json(json_path)
+        cards_by_type, errors = self._load_and_validate_json(json_path)
         
         if errors:
             if verbose:
@@ -121,220 +271,273 @@ class CardGenerator:
                     print(f"   - {error}")
         
         deck_counts = {}
+        cards_added = 0
+        for deck_type, pairs in cards_by_type.items():
+            deck_counts[deck_type] = len(pairs)
+            cards_added += self._process_qa_from_json(deck_type, pairs, verbose)
         
-        # Process all cards in JSON
-        for key, cards_list in data.items():
-            key_lower = key.lower()
-            if key_lower in self._config.deck_type_names:
-                deck_type = self._config.get_deck_type(key_lower) or key.title()
-                cards_processed = self._process_qa_from_json(deck_type, cards_list, verbose)
-                deck_counts[deck_type] = cards_processed
-        
-        # Determine export path
-        if len(deck_counts) == 1:
-            deck_type_for_path = list(deck_counts.keys())[0]
-            output_dir = Path("generated_cards") / self._config.name / deck_type_for_path.lower()
-        else:
-            deck_type_for_path = None
-            output_dir = Path("generated_cards") / self._config.name
-            
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        if self._is_default_output:
-            if deck_type_for_path:
-                self.output_file = str(output_dir / f"{self._config.name}_{deck_type_for_path}.apkg")
-            else:
-                self.output_file = str(output_dir / f"{self._config.name}_learning_deck.apkg")
-        else:
-            out_path = Path(self.output_file)
-            if str(out_path.parent) == ".":
-                self.output_file = str(output_dir / self.output_file)
-
-        # Export
-        if verbose:
-            print(f"💾 Exporting to {self.output_file}...")
-        
-        self.anki.export(self.output_file)
+        self._export(list(deck_counts), verbose)
         
         total_cards = sum(deck_counts.values())
+        skipped = total_cards - cards_added
         if verbose:
-            print(f"✅ Done! Generated {total_cards} cards")
+            print(f"✅ Done! Generated {total_cards} cards" + (f", skipped {skipped} duplicates" if skipped else ""))
         
         return {
             "total_cards": total_cards,
             "deck_counts": deck_counts,
+            "cards_added": cards_added,
+            "duplicates_skipped": skipped,
             "errors": errors
         }
     
-    def _load_and_validate_json(self, json_path: str) -> tuple[dict, List[str]]:
+    def _load_and_validate_json(
+        self,
+        json_path: str
+    ) -> Tuple[Dict[str, List[Tuple[str, str]]], List[str]]:
         """Load and validate the JSON file.
         
+        Results for the most recently imported files are cached per file
+        and language until the file's modification time or size changes,
+        so re-importing an unchanged file (e.g. while editing another part
+        of a deck) skips parsing.
+        
         Args:
             json_path: Path to the JSON file.
             
         Returns:
-            Tuple of (data dict, list of validation errors).
+            Tuple of ((question, answer) pairs of the valid cards per deck
+            type name, list of validation errors).
             
         Raises:
             FileNotFoundError: If the JSON file doesn't exist.
-            json.JSONDecodeError: If the JSON is invalid.
+            ValueError: If the JSON is invalid.
         """
         path = Path(json_path)
-        if not path.exists():
-            raise FileNotFoundError(f"JSON file not found: {json_path}")
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"JSON file not found: {json_path}") from None
+        
+        cache_key = (path.resolve(), self._config.name)
+        cached = _JSON_CACHE.get(cache_key)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            cards_by_type, errors = cached[2]
+            _JSON_CACHE.move_to_end(cache_key)
+        else:
+            cards_by_type, errors = self._validate_json(jsonlib.loads(path.read_bytes()))
+            _JSON_CACHE[cache_key] = (stat.st_mtime_ns, stat.st_size, (cards_by_type, errors))
+            _JSON_CACHE.move_to_end(cache_key)
+            while len(_JSON_CACHE) > _JSON_CACHE_MAX:
+                _JSON_CACHE.popitem(last=False)
+        # Copies, so callers can't change the cached result
+        return {dt: list(pairs) for dt, pairs in cards_by_type.items()}, list(errors)
+    
+    def _validate_json(self, data: Any) -> Tuple[Dict[str, List[Tuple[str, str]]], List[str]]:
+        """Validate parsed JSON card data; see _load_and_validate_json().
         
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        Validation and collecting the valid cards happen in the same pass,
+        so the cards aren't walked a second time to filter them. Arrays
+        whose keys differ only in case (e.g. "grammar" and "Grammar") fill
+        the same deck type.
         
+        Raises:
+            ValueError: If the data doesn't have the expected structure.
+        """
         errors = []
         
         # Validate structure
         if not isinstance(data, dict):
             raise ValueError("JSON root must be an object")
         
-        valid_keys = [k for k in data.keys() if k.lower() in self._config.deck_type_names]
-        if not valid_keys:
-            raise ValueError(f"JSON must contain at least one valid array: {self._config.deck_type_names}")
-        
-        for key in list(data.keys()):
-            key_lower = key.lower()
-            if key_lower not in self._config.deck_type_names:
+        # Each key is lowercased once, here; a JSON without any known key
+        # is rejected after the loop
+        cards_by_type: Dict[str, List[Tuple[str, str]]] = {}
+        for key, cards_list in data.items():
+            entry = self._ct_table.get(key.lower())
+            if entry is None:
                 errors.append(f"Unknown content type in JSON: {key}")
                 continue
                 
-            if not isinstance(data[key], list):
+            if not isinstance(cards_list, list):
                 raise ValueError(f"'{key}' must be an array")
-                
-            required_qa_fields = ["question", "answer"]
-            for i, card in enumerate(data[key]):
-                for field in required_qa_fields:
-                    if field not in card:
-                        errors.append(f"{key.title()} card {i+1}: missing required field '{field}'")
-                    elif not card[field] or not card[field].strip():
-                        errors.append(f"{key.title()} card {i+1}: field '{field}' is empty")
+            
+            label = key.title()
+            pairs = cards_by_type.setdefault(entry[0], [])
+            append = pairs.append
+            for i, card in enumerate(cards_list):
+                if not isinstance(card, dict):
+                    errors.append(f"{label} card {i+1}: must be an object")
+                    continue
+                # One set difference finds all missing fields; only present
+                # fields are checked for content
+                missing = _REQUIRED_QA_FIELD_SET - card.keys()
+                valid = not missing
+                for field in _REQUIRED_QA_FIELDS:
+                    if field in missing:
+                        errors.append(f"{label} card {i+1}: missing required field '{field}'")
+                        continue
+                    value = card[field]
+                    if not isinstance(value, str) or not value.strip():
+                        errors.append(f"{label} card {i+1}: field '{field}' is empty")
+                        valid = False
+                if valid:
+                    append(_qa_pair(card))
         
-        return data, errors
+        if not cards_by_type:
+            raise ValueError(f"JSON must contain at least one valid array: {self._config.deck_type_names}")
+        
+        return cards_by_type, errors
     
     def _process_qa_from_json(
         self,
         deck_type: str,
-        cards_data: List[Dict[str, str]],
+        pairs: List[Tuple[str, str]],
         verbose: bool
     ) -> int:
         """Process Q&A cards from JSON data.
         
         Args:
             deck_type: The deck type name (e.g., "Grammar", "Radicals").
-            cards_data: List of card dicts with question/answer.
+            pairs: (question, answer) pairs of the validated cards.
             verbose: Whether to print progress.
             
         Returns:
             Number of cards added.
         """
         if verbose:
-            print(f"📖 Processing {len(cards_data)} {deck_type.lower()} cards...")
+            print(f"📖 Processing {len(pairs)} {deck_type.lower()} cards...")
         
-        # Ensure deck exists
-        self.anki.create_qa_deck(deck_type)
-        
-        cards_added = 0
-        for card in cards_data:
-            # Skip invalid cards
-            if not card.get("question") or not card.get("answer"):
-                continue
-            
-            self.anki.add_qa_card(
-                deck_type=deck_type,
-                question=card["question"],
-                answer=card["answer"]
-            )
-            cards_added += 1
+        # Cards already in the deck (e.g. from overlapping files) are skipped;
+        # this also creates the deck
+        cards_added = self.anki.extend_qa_cards(deck_type, pairs)
         
         if verbose:
-            print(f"   → Added {cards_added} cards")
+            skipped = len(pairs) - cards_added
+            print(f"   → Added {cards_added} cards" + (f" (skipped {skipped} duplicates)" if skipped else ""))
         
         return cards_added
     
     # ==================== Card Inspection ====================
     
-    def _ask_inspect_cards(self) -> bool:
+    def _ask_inspect_cards(self) -> Optional[str]:
         """Ask the user if they want to inspect cards before adding them.
         
         Returns:
-            True if user wants to inspect, False otherwise.
+            "cards" to review cards one by one, "editor" to review them all
+            at once in a text editor, or None to add them unreviewed.
         """
         while True:
-            response = input("\n🔍 Do you want to inspect cards before adding them to the deck? (yes/no): ").strip().lower()
-            if response in ("yes", "y"):
-                return True
-            elif response in ("no", "n"):
-                return False
-            else:
-                print("   Please enter 'yes' or 'no'.")
+            response = input("\n🔍 Do you want to inspect cards before adding them to the deck? (yes/no/editor): ").strip().lower()
+            if response in _REVIEW_CHOICES:
+                return _REVIEW_CHOICES[response]
+            print("   Please enter 'yes', 'no', or 'editor'.")
     
     def _display_card(self, card: Dict[str, Any], card_type: str, index: int, total: int) -> None:
         """Display a single card in the terminal.
         
+        The card is rendered into one string and written at once, instead
+        of one print() per line. When stdout isn't a terminal, it is
+        written as a single JSON line instead.
+        
         Args:
             card: The card data dict.
-            card_type: Either "vocabulary" or "grammar".
+            card_type: The lowercase deck type (e.g., "vocabulary", "grammar").
             index: Current card index (0-based).
             total: Total number of cards.
         """
-        print(f"\n{'='*50}")
-        print(f"📇 Card {index + 1} of {total} ({card_type})")
-        print(f"{'='*50}")
+        if not sys.stdout.isatty():
+            # Piped to a file or log: one JSON line per card, no decoration
+            fields = {key: card.get(key) for key, _ in _CARD_FIELDS}
+            print(f"Card {index + 1}/{total} ({card_type}): {jsonlib.dumps(fields).decode('utf-8')}")
+            return
         
-        if card_type == "vocabulary":
-            print(f"📝 Word: {card.get('word', 'N/A')}")
-            print(f"🔤 Translation: {card.get('word_translation', 'N/A')}")
-            print(f"💬 Sentence: {card.get('sentence', 'N/A')}")
-            print(f"🔤 Sentence Translation: {card.get('sentence_translation', 'N/A')}")
-        else:  # grammar
-            print(f"❓ Question: {card.get('question', 'N/A')}")
-            print(f"✅ Answer: {card.get('answer', 'N/A')}")
-        
-        print(f"{'='*50}")
+        fields = "".join(
+            f"{label}: {card.get(key, 'N/A')}\n" for key, label in _CARD_FIELDS
+        )
+        print(
+            f"\n{_SEPARATOR}\n📇 Card {index + 1} of {total} ({card_type})\n{_SEPARATOR}\n"
+            f"{fields}{_SEPARATOR}"
+        )
     
     def _edit_card(self, card: Dict[str, Any], card_type: str) -> Dict[str, Any]:
         """Let the user edit individual fields of a card.
         
         Args:
             card: The card data dict to edit.
-            card_type: Either "vocabulary" or "grammar".
+            card_type: The lowercase deck type (e.g., "vocabulary", "grammar").
             
         Returns:
             The edited card dict.
         """
         edited_card = card.copy()
         
-        print("\n✏️  Edit mode - press Enter to keep the current value")
-        print("-" * 40)
-        
-        if card_type == "vocabulary":
-            fields = [
-                ("word", "📝 Word"),
-                ("word_translation", "🔤 Translation"),
-                ("sentence", "💬 Sentence"),
-                ("sentence_translation", "🔤 Sentence Translation")
-            ]
-        else:  # grammar
-            fields = [
-                ("question", "❓ Question"),
-                ("answer", "✅ Answer")
-            ]
+        print("\n✏️  Edit mode - press Enter to keep the current value\n" + "-" * 40)
         
-        for field_key, field_label in fields:
+        for field_key, field_label in _CARD_FIELDS:
             current_value = edited_card.get(field_key, "")
             new_value = input(f"{field_label} [{current_value}]: ").strip()
             if new_value:
                 edited_card[field_key] = new_value
         
-        print("-" * 40)
-        print("✓ Card updated!")
+        print("-" * 40 + "\n✓ Card updated!")
         
         return edited_card
 
+    def _bulk_review(self, cards: List[Dict[str, Any]], card_type: str) -> List[Dict[str, Any]]:
+        """Let the user review all cards at once in their text editor.
+        
+        The cards are written to a temporary tab-separated file and opened
+        with $VISUAL or $EDITOR (nano by default). Deleted lines drop their
+        cards and edited lines replace them. Falls back to the one-by-one
+        review if the editor can't be run.
+        
+        Args:
+            cards: List of card dicts.
+            card_type: The lowercased deck type, used in the file name.
+            
+        Returns:
+            List of approved cards.
+        """
+        editor = os.environ.get("VISUAL") or os.environ.get("EDITOR") or "nano"
+        fd, path = tempfile.mkstemp(prefix=f"{card_type}_cards_", suffix=".tsv")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                lines = [
+                    f"{_tsv_escape(card['question'])}\t{_tsv_escape(card['answer'])}\n"
+                    for card in cards
+                ]
+                f.write(_REVIEW_HEADER + "".join(lines))
+            
+            try:
+                failed = subprocess.call([*shlex.split(editor), path]) != 0
+            except OSError:
+                failed = True
+            if failed:
+                print(f"   Could not run editor '{editor}'; reviewing cards one by one.")
+                return self._inspect_cards_interactively(cards, card_type)
+            
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        finally:
+            os.remove(path)
+        
+        approved_cards = []
+        for line in text.splitlines():
+            if not line.strip() or line.startswith("#"):
+                continue
+            question, sep, answer = line.partition("\t")
+            if not sep:
+                print(f"   ✗ Skipped line without a tab: {line}")
+                continue
+            approved_cards.append({
+                "question": _tsv_unescape(question),
+                "answer": _tsv_unescape(answer),
+            })
+        
+        print(f"\n📊 Summary: {len(approved_cards)}/{len(cards)} cards approved for addition.")
+        return approved_cards
+    
     def _inspect_cards_interactively(
         self,
         cards: List[Dict[str, Any]],
@@ -359,14 +562,15 @@ class CardGenerator:
                 self._display_card(current_card, card_type, i, total)
                 
                 response = input("➕ Add this card to the deck? ([yes]/no/edit): ").strip().lower()
-                if response in ("yes", "y", ""):
+                action = _CARD_ACTIONS.get(response)
+                if action == "add":
                     approved_cards.append(current_card)
                     print("   ✓ Card will be added.")
                     break
-                elif response in ("no", "n"):
+                elif action == "skip":
                     print("   ✗ Card skipped.")
                     break
-                elif response in ("edit", "e"):
+                elif action == "edit":
                     current_card = self._edit_card(current_card, card_type)
                     # Loop continues to re-display the edited card
                 else:
@@ -402,15 +606,11 @@ class CardGenerator:
                 - content_type: "grammar" or "vocabulary"
                 - category: Category name (for vocabulary) or None
                 - cards_generated: Number of cards generated
+                - cards_added: How many of them were new to the deck
                 - deck_action: "extended" or "created"
         """
         if content_type:
-            content_type = content_type.lower()
-            if content_type not in self._config.deck_type_names:
-                raise ValueError(
-                    f"Invalid content type '{content_type}' for {self._config.name}. "
-                    f"Valid types: {', '.join(self._config.deck_type_names)}"
-                )
+            content_type = self._validate_content_type(content_type)
             if verbose:
                 print(f"🔍 Using provided content type: {content_type.upper()}")
 
@@ -418,91 +618,300 @@ class CardGenerator:
             print(f"📄 Extracting pages {start_page}-{end_page} from PDF...")
         
         # Step 1: Extract pages as PDF bytes
-        pdf_bytes = extract_pages_as_pdf(pdf_path, start_page, end_page)
+        pdf_bytes = self._extract_pages(pdf_path, start_page, end_page)
         
         if verbose:
             print(f"📝 Extracted {len(pdf_bytes)} bytes ({end_page - start_page + 1} pages)")
         
-        # Step 2: Classify content (skip if provided)
-        if not content_type:
+        try:
+            # Step 2: Classify content (skip if provided)
+            cards = None
+            if not content_type:
+                if verbose:
+                    print("🔍 Classifying content type...")
+                if self.local_classify:
+                    from gemini.pdf_processor import heuristic_classify
+                    
+                    content_type = heuristic_classify(pdf_bytes, self._config.deck_types)
+                if not content_type:
+                    if self.combined:
+                        # One request that classifies and generates at the same time
+                        content_type, cards = self.gemini.classify_and_generate(
+                            pdf_bytes, custom_prompt=self.custom_prompt, template=template
+                        )
+                    else:
+                        content_type = self.gemini.classify_content(pdf_bytes)
+                if verbose:
+                    print(f"   → Detected: {content_type.upper()}")
+            
+            # Step 3 & 4: Generate cards and update decks
+            deck_type = self._resolve_deck_type(content_type)
+            result = self._handle_qa_type(deck_type, pdf_bytes, verbose, template=template, cards=cards)
+        finally:
+            self._release_uploads()
+        
+        # Step 5: Export
+        self._export([deck_type], verbose)
+        
+        if verbose:
+            print(f"✅ Done! Generated {result['cards_generated']} cards, {result['cards_added']} new")
+        
+        return result
+    
+    def generate_from_pdf_batch(
+        self,
+        pdf_path: str,
+        ranges: List[Tuple[int, int]],
+        content_type: Optional[str] = None,
+        verbose: bool = True,
+        template: Optional[str] = None
+    ) -> dict:
+        """Generate cards from several page ranges of a PDF in batched requests.
+        
+        Like PDFCardGenerator.generate_from_pdf_ranges(), each range is
+        classified on its own and ranges of the same deck type then share
+        one generate_qa_cards_batch() request.
+        
+        Args:
+            pdf_path: Path to the PDF file.
+            ranges: List of (start_page, end_page) tuples (1-indexed, inclusive).
+                Must not be empty.
+            content_type: Optional. Applies to every range and skips classification.
+            verbose: Whether to print progress messages.
+            template: Optional card formatting template (e.g., "basic", "detailed").
+            
+        Returns:
+            A summary dict with:
+                - deck_counts: Cards generated per deck type
+                - cards_generated: Total number of cards generated
+                - cards_added: How many of them were new to their decks
+        """
+        from gemini.generator import classify_ranges, generate_ranges_batched
+        
+        self._validate_ranges(ranges)
+        if content_type:
+            content_type = self._validate_content_type(content_type)
+        
+        pdf_list = []
+        for start_page, end_page in ranges:
             if verbose:
-                print("🔍 Classifying content type...")
-            content_type = self.gemini.classify_content(pdf_bytes)
+                print(f"📄 Extracting pages {start_page}-{end_page} from PDF...")
+            pdf_list.append(self._extract_pages(pdf_path, start_page, end_page))
+        
+        try:
+            if content_type:
+                range_types = [content_type] * len(pdf_list)
+            else:
+                if verbose:
+                    print(f"🔍 Classifying {len(pdf_list)} range(s)...")
+                range_types = classify_ranges(self.gemini, pdf_list, self.local_classify)
+            deck_types = [self._resolve_deck_type(range_type) for range_type in range_types]
+            
+            if verbose:
+                print(f"🤖 Generating cards for {len(pdf_list)} range(s), one request per deck type...")
+            batches = generate_ranges_batched(
+                self.gemini, pdf_list, deck_types, custom_prompt=self.custom_prompt, template=template
+            )
+        finally:
+            # Large ranges go through the File API; don't leave them behind
+            self._release_uploads()
+        
+        # Merge the ranges of each deck type, preserving first-seen order
+        grouped: Dict[str, List[Dict]] = {}
+        for (start_page, end_page), deck_type, cards in zip(ranges, deck_types, batches):
             if verbose:
-                print(f"   → Detected: {content_type.upper()}")
+                print(f"   → Pages {start_page}-{end_page}: {deck_type.upper()}, {len(cards)} cards")
+            grouped.setdefault(deck_type, []).extend(cards)
         
-        # Step 3 & 4: Generate cards and update decks
-        deck_type = self._config.get_deck_type(content_type)
-        if deck_type is None:
-            deck_type = content_type.title()
-        result = self._handle_qa_type(deck_type, pdf_bytes, verbose, template=template)
+        deck_counts = {}
+        added = 0
+        for deck_type, cards in grouped.items():
+            result = self._handle_qa_type(deck_type, None, verbose, template=template, cards=cards)
+            deck_counts[deck_type] = result["cards_generated"]
+            added += result["cards_added"]
         
-        # Step 5: Determine export path
-        output_dir = Path("generated_cards") / self._config.name / deck_type.lower()
-        output_dir.mkdir(parents=True, exist_ok=True)
+        self._export(list(deck_counts), verbose)
         
-        if self._is_default_output:
-            self.output_file = str(output_dir / f"{self._config.name}_{deck_type}.apkg")
-        else:
-            out_path = Path(self.output_file)
-            if str(out_path.parent) == ".":
-                self.output_file = str(output_dir / self.output_file)
+        total = sum(deck_counts.values())
         if verbose:
-            print(f"💾 Exporting to {self.output_file}...")
+            print(f"✅ Done! Generated {total} cards, {added} new")
         
-        self.anki.export(self.output_file)
+        return {"deck_counts": deck_counts, "cards_generated": total, "cards_added": added}
+    
+    async def agenerate_from_pdf(
+        self,
+        pdf_path: str,
+        ranges: List[Tuple[int, int]],
+        content_type: Optional[str] = None,
+        verbose: bool = True,
+        template: Optional[str] = None
+    ) -> dict:
+        """Generate cards from several page ranges of a PDF with concurrent requests.
+        
+        Unlike generate_from_pdf_batch(), every range keeps its own
+        classification and generation requests. They go through the same
+        pipeline as PDFCardGenerator.generate_from_pdf_batches(), so the
+        ranges' round-trips overlap with up to 10 in flight at once.
+        
+        Args:
+            pdf_path: Path to the PDF file.
+            ranges: List of (start_page, end_page) tuples (1-indexed, inclusive).
+                Must not be empty.
+            content_type: Optional. Applies to every range and skips classification.
+            verbose: Whether to print progress messages.
+            template: Optional card formatting template (e.g., "basic", "detailed").
+            
+        Returns:
+            A summary dict with:
+                - deck_counts: Cards generated per deck type
+                - cards_generated: Total number of cards generated
+                - cards_added: How many of them were new to their decks
+        """
+        from gemini.generator import agenerate_ranges
+        from gemini.pdf_processor import heuristic_classify
+        
+        self._validate_ranges(ranges)
+        if content_type:
+            content_type = self._validate_content_type(content_type)
+        
+        # PyMuPDF isn't thread-safe: extract and pre-classify up front
+        pdf_list = []
+        range_types = []
+        for start_page, end_page in ranges:
+            if verbose:
+                print(f"📄 Extracting pages {start_page}-{end_page} from PDF...")
+            pdf_bytes = self._extract_pages(pdf_path, start_page, end_page)
+            pdf_list.append(pdf_bytes)
+            range_type = content_type
+            if not range_type and self.local_classify:
+                range_type = heuristic_classify(pdf_bytes, self._config.deck_types)
+            range_types.append(range_type)
         
         if verbose:
-            print(f"✅ Done! Generated {result['cards_generated']} cards")
+            print(f"🤖 Processing {len(pdf_list)} range(s) concurrently...")
+        try:
+            results = await agenerate_ranges(
+                self.gemini,
+                pdf_list,
+                range_types,
+                self._resolve_deck_type,
+                custom_prompt=self.custom_prompt,
+                template=template
+            )
+        finally:
+            self._release_uploads()
         
-        return result
+        # AnkiGenerator isn't thread-safe: merge everything back here, in order
+        grouped: Dict[str, List[Dict]] = {}
+        for (start_page, end_page), (deck_type, cards) in zip(ranges, results):
+            if verbose:
+                print(f"   → Pages {start_page}-{end_page}: {deck_type.upper()}, {len(cards)} cards")
+            grouped.setdefault(deck_type, []).extend(cards)
+        
+        deck_counts = {}
+        added = 0
+        for deck_type, cards in grouped.items():
+            result = self._handle_qa_type(deck_type, None, verbose, template=template, cards=cards)
+            deck_counts[deck_type] = result["cards_generated"]
+            added += result["cards_added"]
+        
+        self._export(list(deck_counts), verbose)
+        
+        total = sum(deck_counts.values())
+        if verbose:
+            print(f"✅ Done! Generated {total} cards, {added} new")
+        
+        return {"deck_counts": deck_counts, "cards_generated": total, "cards_added": added}
+    
+    def _extract_pages(self, pdf_path: str, start_page: int, end_page: int) -> bytes:
+        """Extract a page range, reusing cached extracts unless caching is off."""
+        from gemini.pdf_processor import extract_pages_as_pdf, RANGE_CACHE_DIR
+        
+        return extract_pages_as_pdf(
+            pdf_path, start_page, end_page, cache_dir=RANGE_CACHE_DIR if self.use_cache else None
+        )
+    
+    def _write_deck(self) -> None:
+        """Export the decks to self.output_file."""
+        self.anki.export(self.output_file)
     
-    def _handle_qa_type(self, deck_type: str, pdf_bytes: bytes, verbose: bool, template: Optional[str] = None) -> dict:
+    def _handle_qa_type(
+        self,
+        deck_type: str,
+        pdf_bytes: Optional[bytes],
+        verbose: bool,
+        template: Optional[str] = None,
+        cards: Optional[List[Dict]] = None
+    ) -> dict:
         """Handle Q&A content: generate cards and add to the appropriate deck.
         
         Args:
             deck_type: The deck type name (e.g., "Grammar", "Radicals").
-            pdf_bytes: The PDF pages as bytes.
+            pdf_bytes: The PDF pages as bytes. Unused if cards is given.
             verbose: Whether to print progress messages.
             template: Optional card formatting template (e.g., "basic", "detailed").
+            cards: Cards already generated for this deck type, if any.
             
         Returns:
-            Summary dict with content_type and cards_generated.
+            Summary dict with content_type, cards_generated (cards kept
+            after review, repeats included) and cards_added (those new to
+            the deck; the rest were skipped as duplicates).
         """
-        if verbose:
-            print(f"📚 Generating {deck_type.lower()} cards...")
+        if cards is None:
+            if verbose:
+                print(f"📚 Generating {deck_type.lower()} cards...")
+            
+            cards = self.gemini.generate_qa_cards(
+                deck_type, 
+                pdf_bytes, 
+                custom_prompt=self.custom_prompt,
+                template=template
+            )
         
-        cards = self.gemini.generate_qa_cards(
-            deck_type, 
-            pdf_bytes, 
-            custom_prompt=self.custom_prompt,
-            template=template
-        )
+        # Overlapping page ranges yield the same cards more than once; drop
+        # the repeats before they are shown for review
+        generated = len(cards)
+        cards = list({_qa_pair(card): card for card in cards}.values())
+        repeats = generated - len(cards)
         
         if verbose:
-            print(f"   → Generated {len(cards)} {deck_type.lower()} cards")
+            print(f"   → Generated {generated} {deck_type.lower()} cards")
+            if repeats:
+                print(f"   → Skipped {repeats} duplicates")
         
         # Ask if user wants to inspect cards before adding
-        if cards and self._ask_inspect_cards():
+        review = self._ask_inspect_cards() if cards else None
+        if review == "editor":
+            cards = self._bulk_review(cards, deck_type.lower())
+        elif review:
             cards = self._inspect_cards_interactively(cards, deck_type.lower())
         
-        # Ensure deck exists and add cards
-        self.anki.create_qa_deck(deck_type)
-        
-        for card in cards:
-            self.anki.add_qa_card(
-                deck_type=deck_type,
-                question=card["question"],
-                answer=card["answer"]
-            )
+        # Add all cards in one call, which also creates the deck; cards
+        # already in it (e.g. from an earlier range) are skipped
+        cards_added = self.anki.extend_qa_cards(
+            deck_type, list(map(_qa_pair, cards))
+        )
         
         return {
             "content_type": deck_type.lower(),
             "category": None,
-            "cards_generated": len(cards),
+            "cards_generated": len(cards) + repeats,
+            "cards_added": cards_added,
         }
 
 
+def _page_ranges(value: str) -> List[Tuple[int, int]]:
+    """argparse type for --ranges; see gemini.generator.parse_page_ranges()."""
+    from gemini.generator import parse_page_ranges
+    
+    return parse_page_ranges(value)
+
+
+def _chunk_range(start_page: int, end_page: int, size: int) -> List[Tuple[int, int]]:
+    """Split a page range into consecutive ranges of at most size pages."""
+    return [(start, min(start + size - 1, end_page)) for start in range(start_page, end_page + 1, size)]
+
+
 def main():
     """CLI entry point for the card generator."""
     import argparse
@@ -536,6 +945,12 @@ def main():
         type=int,
         help="Ending page number for PDF (1-indexed, required with --pdf)"
     )
+    parser.add_argument(
+        "--ranges",
+        type=_page_ranges,
+        help="Comma-separated page ranges for PDF, sent in one Gemini request "
+             "(e.g., 1-10,11-20,25). Replaces --start-page/--end-page."
+    )
     parser.add_argument(
         "-t", "--type",
         help="Content type for PDF (e.g., grammar, vocabulary, radicals). If provided, skips classification."
@@ -577,48 +992,120 @@ def main():
         help=f"Card formatting template to use (e.g. {', '.join(CARD_TEMPLATES.keys())})"
     )
     
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuse page extracts and Gemini responses cached on disk from earlier runs"
+    )
+    
+    parser.add_argument(
+        "--no-batch",
+        action="store_true",
+        help="With --ranges, send concurrent requests per range instead of one batched request per deck type"
+    )
+    
+    parser.add_argument(
+        "--chunk-pages",
+        type=int,
+        metavar="N",
+        help="Split the pages into ranges of N pages and process them concurrently (implies --no-batch)"
+    )
+    parser.add_argument(
+        "--heuristic",
+        action="store_true",
+        help="Classify clear-cut pages locally from their text instead of asking Gemini"
+    )
+    parser.add_argument(
+        "--combined",
+        action="store_true",
+        help="Without --type, classify and generate in one Gemini request instead of two"
+    )
+    parser.add_argument(
+        "--max-rps",
+        type=float,
+        metavar="RATE",
+        help="Limit concurrent Gemini requests to RATE requests per second"
+    )
+    
     args = parser.parse_args()
     
     # Validate PDF arguments
-    if args.pdf:
+    if args.pdf and not args.ranges:
         if args.start_page is None or args.end_page is None:
             parser.error("--start-page and --end-page are required when using --pdf")
+    if args.chunk_pages is not None and args.chunk_pages < 1:
+        parser.error("--chunk-pages must be at least 1")
     
-    generator = CardGenerator(
+    with CardGenerator(
         model=args.model,
         language=args.language,
         output_file=args.output,
         registry_path=args.registry,
-        custom_prompt=args.prompt
-    )
-    
-    if args.json:
-        # JSON mode
-        result = generator.generate_from_json(
-            json_path=args.json,
-            verbose=not args.quiet
-        )
+        custom_prompt=args.prompt,
+        use_cache=args.cache,
+        requests_per_second=args.max_rps,
+        local_classify=args.heuristic,
+        combined=args.combined
+    ) as generator:
+        if args.json:
+            # JSON mode
+            result = generator.generate_from_json(
+                json_path=args.json,
+                verbose=not args.quiet
+            )
         
-        print(f"\nSummary:")
-        print(f"  Total cards: {result['total_cards']}")
-        for deck, count in result['deck_counts'].items():
-            print(f"  {deck} cards: {count}")
-        if result['errors']:
-            print(f"  Validation warnings: {len(result['errors'])}")
-    else:
-        # PDF mode
-        result = generator.generate_from_pdf(
-            pdf_path=args.pdf,
-            start_page=args.start_page,
-            end_page=args.end_page,
-            content_type=args.type,
-            verbose=not args.quiet,
-            template=args.template
-        )
+            print(f"\nSummary:")
+            print(f"  Total cards: {result['total_cards']}")
+            for deck, count in result['deck_counts'].items():
+                print(f"  {deck} cards: {count}")
+            print(f"  Cards added: {result['cards_added']}")
+            if result['duplicates_skipped']:
+                print(f"  Duplicates skipped: {result['duplicates_skipped']}")
+            if result['errors']:
+                print(f"  Validation warnings: {len(result['errors'])}")
+        elif args.ranges or args.chunk_pages:
+            # Multi-range PDF mode: batched requests per deck type, or concurrent per-range requests
+            ranges = args.ranges or [(args.start_page, args.end_page)]
+            if args.chunk_pages:
+                ranges = [chunk for r in ranges for chunk in _chunk_range(*r, args.chunk_pages)]
+            range_args = dict(
+                pdf_path=args.pdf,
+                ranges=ranges,
+                content_type=args.type,
+                verbose=not args.quiet,
+                template=args.template
+            )
+            if args.no_batch or args.chunk_pages:
+                import asyncio
+            
+                result = asyncio.run(generator.agenerate_from_pdf(**range_args))
+            else:
+                result = generator.generate_from_pdf_batch(**range_args)
+        
+            print(f"\nSummary:")
+            for deck, count in result['deck_counts'].items():
+                print(f"  {deck} cards: {count}")
+            print(f"  Cards generated: {result['cards_generated']}")
+            print(f"  Cards added: {result['cards_added']}")
+            if result['cards_generated'] > result['cards_added']:
+                print(f"  Duplicates skipped: {result['cards_generated'] - result['cards_added']}")
+        else:
+            # PDF mode
+            result = generator.generate_from_pdf(
+                pdf_path=args.pdf,
+                start_page=args.start_page,
+                end_page=args.end_page,
+                content_type=args.type,
+                verbose=not args.quiet,
+                template=args.template
+            )
         
-        print(f"\nSummary:")
-        print(f"  Content type: {result['content_type']}")
-        print(f"  Cards generated: {result['cards_generated']}")
+            print(f"\nSummary:")
+            print(f"  Content type: {result['content_type']}")
+            print(f"  Cards generated: {result['cards_generated']}")
+            print(f"  Cards added: {result['cards_added']}")
+            if result['cards_generated'] > result['cards_added']:
+                print(f"  Duplicates skipped: {result['cards_generated'] - result['cards_added']}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+"""Round-trip tests for exported .apkg packages, read back with sqlite3."""
+
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+import zipfile
+
+import genanki
+
+from anki_generator import AnkiGenerator, GERMAN
+
+_PAIRS = [("der Hund", "dog"), ("die Katze", "cat")]
+
+
+def _read_collection(apkg) -> dict:
+    """Open the collection of an .apkg (path or file object) and summarize it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        with zipfile.ZipFile(apkg) as package:
+            names = package.namelist()
+            db_path = package.extract("collection.anki2", tmp)
+            media = json.loads(package.read("media"))
+        conn = sqlite3.connect(db_path)
+        try:
+            notes = conn.execute("SELECT guid, mid, flds FROM notes ORDER BY id").fetchall()
+            models, decks = conn.execute("SELECT models, decks FROM col").fetchone()
+        finally:
+            conn.close()
+    return {
+        "names": names,
+        "media": media,
+        "notes": notes,
+        "models": json.loads(models),
+        "decks": json.loads(decks),
+    }
+
+
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.gen = AnkiGenerator(GERMAN)
+        self.gen.extend_qa_cards("Grammar", _PAIRS)
+
+    def test_export_round_trip(self):
+        path = self.gen.export(os.path.join(self._tmp.name, "deck"))
+        self.assertTrue(path.endswith(".apkg"))
+        collection = _read_collection(path)
+
+        self.assertEqual(collection["media"], {})
+        self.assertEqual(
+            [guid for guid, _, _ in collection["notes"]],
+            [genanki.guid_for(question, answer) for question, answer in _PAIRS],
+        )
+        self.assertEqual(
+            [flds.split("\x1f") for _, _, flds in collection["notes"]],
+            [list(pair) for pair in _PAIRS],
+        )
+        model = GERMAN.qa_models["Grammar"]
+        self.assertEqual({mid for _, mid, _ in collection["notes"]}, {model.model_id})
+        self.assertIn(str(model.model_id), collection["models"])
+        deck_names = {deck["name"] for deck in collection["decks"].values()}
+        self.assertIn(GERMAN.qa_deck_name("Grammar"), deck_names)
+
+    def test_fields_are_exported_unchanged(self):
+        gen = AnkiGenerator(GERMAN)
+        gen.add_qa_card("Grammar", "a < b & c?", "line one\nline two")
+        collection = _read_collection(gen.export(os.path.join(self._tmp.name, "fields.apkg")))
+        self.assertEqual(
+            [flds.split("\x1f") for _, _, flds in collection["notes"]],
+            [["a < b & c?", "line one\nline two"]],
+        )
+
+    def test_answer_equal_to_question_is_kept(self):
+        gen = AnkiGenerator(GERMAN)
+        self.assertEqual(gen.extend_qa_cards("Grammar", [("Name", "Name")]), 1)
+        collection = _read_collection(gen.export(os.path.join(self._tmp.name, "same.apkg")))
+        self.assertEqual(len(collection["notes"]), 1)
+
+    def test_export_to_fileobj_matches_export(self):
+        buffer = io.BytesIO()
+        self.gen.export_to_fileobj(buffer)
+        buffer.seek(0)
+        from_fileobj = _read_collection(buffer)
+        from_file = _read_collection(self.gen.export(os.path.join(self._tmp.name, "deck.apkg")))
+        self.assertEqual(
+            [guid for guid, _, _ in from_fileobj["notes"]],
+            [guid for guid, _, _ in from_file["notes"]],
+        )
+
+    def test_reexport_keeps_earlier_cards(self):
+        path = os.path.join(self._tmp.name, "deck.apkg")
+        self.gen.export(path)
+        self.gen.add_qa_card("Grammar", "das Haus", "house")
+        self.gen.export(path)
+        self.assertEqual(len(_read_collection(path)["notes"]), 3)
+
+    def test_card_added_again_after_export_is_skipped(self):
+        path = os.path.join(self._tmp.name, "deck.apkg")
+        self.gen.export(path)
+        self.assertEqual(self.gen.extend_qa_cards("Grammar", _PAIRS[:1]), 0)
+        self.gen.export(path)
+        self.assertEqual(len(_read_collection(path)["notes"]), len(_PAIRS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""Tests for DeckRegistry's on-disk format and lookups."""
+
+import json
+import os
+import tempfile
+import unittest
+
+from gemini.deck_registry import DeckRegistry
+
+
+class DeckRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, "deck_registry.json")
+
+    def test_categories_are_saved_as_a_list(self):
+        with DeckRegistry(self.path) as registry:
+            registry.register_vocabulary_category("Body Parts")
+            registry.register_vocabulary_category("body parts ")
+            registry.register_vocabulary_category("Food")
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"vocabulary_categories": ["Body Parts", "Food"]})
+
+    def test_reads_existing_list_file(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"vocabulary_categories": ["Body Parts", "Food"]}, f)
+        registry = DeckRegistry(self.path)
+        self.assertTrue(registry.vocabulary_category_exists("FOOD"))
+        self.assertEqual(registry.find_matching_category(" body parts"), "Body Parts")
+        self.assertIsNone(registry.find_matching_category("Body Part"))
+        self.assertEqual(registry.get_vocabulary_categories(), ["Body Parts", "Food"])
+
+    def test_flush_without_changes_writes_nothing(self):
+        DeckRegistry(self.path).flush()
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+"""Tests for GeminiClient response handling, using a fake genai client."""
+
+import asyncio
+import json
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from anki_generator import GERMAN
+from gemini import gemini_client
+from gemini.gemini_client import GeminiClient
+
+
+class _FakeModels:
+    """Returns the queued response texts in order and records each request."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def generate_content(self, model, contents, config=None):
+        self.requests.append(contents)
+        return SimpleNamespace(text=self.replies.pop(0))
+
+
+def _client(*replies):
+    models = _FakeModels(replies)
+    client = GeminiClient(GERMAN, client=SimpleNamespace(models=models), cache_dir=None)
+    return client, models
+
+
+_CARDS = [{"question": "Was ist der Akkusativ von 'der'?", "answer": "den"}]
+
+
+class ClassifyAndGenerateTest(unittest.TestCase):
+
+    def test_object_reply(self):
+        client, models = _client(json.dumps({"content_type": "grammar", "cards": _CARDS}))
+        self.assertEqual(client.classify_and_generate(b"%PDF"), ("grammar", _CARDS))
+        self.assertEqual(len(models.requests), 1)
+
+    def test_list_reply_falls_back_to_two_requests(self):
+        fenced_list = "```json\n" + json.dumps(_CARDS) + "\n```"
+        client, models = _client(fenced_list, "grammar", json.dumps({"cards": _CARDS}))
+        self.assertEqual(client.classify_and_generate(b"%PDF"), ("grammar", _CARDS))
+        self.assertEqual(len(models.requests), 3)
+
+    def test_scalar_reply_falls_back_to_two_requests(self):
+        client, models = _client('"grammar"', "grammar", json.dumps({"cards": _CARDS}))
+        self.assertEqual(client.classify_and_generate(b"%PDF"), ("grammar", _CARDS))
+        self.assertEqual(len(models.requests), 3)
+
+
+class GenerateBatchTest(unittest.TestCase):
+
+    def test_list_reply_retries_non_objects(self):
+        documents = [{"cards": _CARDS}, ["not", "a", "document"]]
+        client, models = _client(json.dumps(documents), json.dumps({"cards": _CARDS}))
+        results = client.generate_qa_cards_batch("Grammar", [b"%PDF-1", b"%PDF-2"])
+        self.assertEqual(results, [_CARDS, _CARDS])
+        self.assertEqual(len(models.requests), 2)
+
+    def test_extra_documents_are_ignored(self):
+        other = [{"question": "q", "answer": "a"}]
+        documents = {"documents": [{"cards": _CARDS}, {"cards": other}, {"cards": _CARDS}]}
+        client, models = _client(json.dumps(documents))
+        results = client.generate_qa_cards_batch("Grammar", [b"%PDF-1", b"%PDF-2"])
+        self.assertEqual(results, [_CARDS, other])
+        self.assertEqual(len(models.requests), 1)
+
+    def test_missing_documents_are_retried_singly(self):
+        documents = {"documents": [{"cards": _CARDS}]}
+        client, models = _client(json.dumps(documents), json.dumps({"cards": _CARDS}))
+        results = client.generate_qa_cards_batch("Grammar", [b"%PDF-1", b"%PDF-2"])
+        self.assertEqual(results, [_CARDS, _CARDS])
+        self.assertEqual(len(models.requests), 2)
+        # The retry sends only the document the batch reply left out
+        self.assertEqual(models.requests[1][0].inline_data.data, b"%PDF-2")
+
+
+@mock.patch.object(gemini_client, "UPLOAD_THRESHOLD", 0)
+class UploadTest(unittest.TestCase):
+
+    def test_uploads_of_different_pdfs_overlap(self):
+        client, _ = _client()
+        both_started = threading.Barrier(2, timeout=5)
+
+        def upload(pdf_bytes):
+            # Deadlocks (and breaks the barrier) if uploads are serialized
+            both_started.wait()
+            return SimpleNamespace(uri=f"files/{len(pdf_bytes)}", name=f"files/{len(pdf_bytes)}")
+
+        with mock.patch.object(client, "_upload", side_effect=upload):
+            threads = [threading.Thread(target=client._pdf_part, args=(pdf,)) for pdf in (b"%PDF-1", b"%PDF-22")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertFalse(both_started.broken)
+        self.assertEqual(len(client._uploads), 2)
+
+    def test_failed_upload_is_retried(self):
+        client, _ = _client()
+        uploaded = SimpleNamespace(uri="files/1", name="files/1")
+        with mock.patch.object(client, "_upload", side_effect=[OSError("reset"), uploaded]) as upload:
+            with self.assertRaises(OSError):
+                client._pdf_part(b"%PDF")
+            client._pdf_part(b"%PDF")
+            client._pdf_part(b"%PDF")
+        self.assertEqual(upload.call_count, 2)
+
+
+class ContextCacheTest(unittest.TestCase):
+
+    def test_prompt_is_cached_once_while_an_upload_is_running(self):
+        created = []
+        caches = SimpleNamespace(create=lambda model, config: created.append(config) or SimpleNamespace(name="cachedContents/1"))
+        client = GeminiClient(GERMAN, client=SimpleNamespace(caches=caches), cache_dir=None, context_cache=True)
+        # Prompt caching has its own lock, independent of uploads
+        with client._upload_lock:
+            self.assertEqual(client._cached_content("prompt"), "cachedContents/1")
+            self.assertEqual(client._cached_content("prompt"), "cachedContents/1")
+        self.assertEqual(len(created), 1)
+
+
+
+class _FakeAio:
+    """Async client that, like httpx's, only works on the loop it first ran on."""
+
+    def __init__(self, replies):
+        self.loop = None
+        self.closed = False
+        self.models = self
+        self.replies = replies
+
+    async def generate_content(self, model, contents, config=None):
+        loop = asyncio.get_running_loop()
+        if self.closed or self.loop not in (None, loop):
+            raise RuntimeError("Event loop is closed")
+        self.loop = loop
+        return SimpleNamespace(text=self.replies.pop(0))
+
+    async def aclose(self):
+        self.closed = True
+
+
+class AsyncClientTest(unittest.TestCase):
+
+    def test_each_asyncio_run_gets_its_own_async_client(self):
+        replies = ["grammar", "vocabulary"]
+        created = []
+
+        def make_client(api_key):
+            created.append(_FakeAio(replies))
+            return SimpleNamespace(aio=created[-1])
+
+        with mock.patch.object(gemini_client.genai, "Client", side_effect=make_client), \
+                mock.patch.dict(gemini_client._CLIENT_CACHE, clear=True):
+            client = GeminiClient(GERMAN, api_key="key", cache_dir=None)
+
+            async def classify():
+                try:
+                    return await client.aclassify_content(b"%PDF")
+                finally:
+                    await client.aclose()
+
+            self.assertEqual(asyncio.run(classify()), "grammar")
+            self.assertEqual(asyncio.run(classify()), "vocabulary")
+        # The shared client plus one async client per run, each closed
+        self.assertEqual(len(created), 3)
+        self.assertEqual([aio.closed for aio in created[1:]], [True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
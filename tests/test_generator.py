@@ -0,0 +1,159 @@
+"""Tests for CardGenerator's PDF flow (with a fake GeminiClient) and JSON imports."""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import fitz
+
+import generator as generator_module
+from gemini.generator import parse_page_ranges
+from generator import CardGenerator
+
+_CARDS = [{"question": "Was ist der Akkusativ von 'der'?", "answer": "den"}]
+
+
+class _FakeGemini:
+    """Records which GeminiClient methods the generator calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def classify_content(self, pdf_bytes):
+        self.calls.append("classify_content")
+        return "grammar"
+
+    def generate_qa_cards(self, deck_type, pdf_bytes, custom_prompt=None, template=None):
+        self.calls.append("generate_qa_cards")
+        return list(_CARDS)
+
+    def classify_and_generate(self, pdf_bytes, custom_prompt=None, template=None):
+        self.calls.append("classify_and_generate")
+        return "grammar", list(_CARDS)
+
+    def release_uploads(self):
+        pass
+
+
+class _GeneratorTestCase(unittest.TestCase):
+    """Runs each test in a temporary directory holding a one-page PDF."""
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), "Der Akkusativ")
+        doc.save("book.pdf")
+        doc.close()
+        # Don't stop for the "inspect cards?" question
+        patcher = mock.patch("builtins.input", return_value="no")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _generator(self, **kwargs):
+        generator = CardGenerator(
+            output_file=os.path.join(self._tmp.name, "out.apkg"),
+            registry_path="registry.json",
+            **kwargs
+        )
+        generator._gemini = _FakeGemini()
+        return generator
+
+
+class GenerateFromPdfTest(_GeneratorTestCase):
+
+    def test_classifies_then_generates_by_default(self):
+        generator = self._generator()
+        gemini = generator._gemini
+        result = generator.generate_from_pdf("book.pdf", 1, 1, verbose=False)
+        self.assertEqual(gemini.calls, ["classify_content", "generate_qa_cards"])
+        self.assertEqual(result["content_type"], "grammar")
+        self.assertEqual(result["cards_generated"], 1)
+
+    def test_combined_request_is_opt_in(self):
+        generator = self._generator(combined=True)
+        gemini = generator._gemini
+        result = generator.generate_from_pdf("book.pdf", 1, 1, verbose=False)
+        self.assertEqual(gemini.calls, ["classify_and_generate"])
+        self.assertEqual(result["cards_generated"], 1)
+
+    def test_given_type_skips_classification(self):
+        generator = self._generator(combined=True)
+        gemini = generator._gemini
+        generator.generate_from_pdf("book.pdf", 1, 1, content_type="grammar", verbose=False)
+        self.assertEqual(gemini.calls, ["generate_qa_cards"])
+
+    def test_repeated_cards_count_as_generated_not_added(self):
+        generator = self._generator()
+        generator._gemini.generate_qa_cards = lambda *args, **kwargs: _CARDS * 2
+        result = generator.generate_from_pdf("book.pdf", 1, 1, content_type="grammar", verbose=False)
+        self.assertEqual(result["cards_generated"], 2)
+        self.assertEqual(result["cards_added"], 1)
+
+    def test_original_error_surfaces_without_a_client(self):
+        generator = self._generator(local_classify=True)
+        generator._gemini = None
+        # Classification fails before any client is needed; cleanup must not
+        # then try to build one (which would fail here without an API key)
+        with mock.patch.dict(os.environ, {"GEMINI_API_KEY": ""}), \
+                mock.patch("gemini.pdf_processor.heuristic_classify", side_effect=RuntimeError("bad page")), \
+                self.assertRaisesRegex(RuntimeError, "bad page"):
+            generator.generate_from_pdf("book.pdf", 1, 1, verbose=False)
+        self.assertIsNone(generator._gemini)
+
+
+class PageRangesTest(_GeneratorTestCase):
+
+    def test_parse_page_ranges(self):
+        self.assertEqual(parse_page_ranges("1-10, 11-20,25"), [(1, 10), (11, 20), (25, 25)])
+
+    def test_parse_page_ranges_rejects_invalid_ranges(self):
+        for value in ("", "1-", "a-3", "1-3,", "0-2", "5-3"):
+            with self.subTest(value=value), self.assertRaises(argparse.ArgumentTypeError):
+                parse_page_ranges(value)
+
+    def test_empty_ranges_are_rejected(self):
+        generator = self._generator()
+        with self.assertRaisesRegex(ValueError, "page range"):
+            generator.generate_from_pdf_batch("book.pdf", [], verbose=False)
+        with self.assertRaisesRegex(ValueError, "page range"):
+            asyncio.run(generator.agenerate_from_pdf("book.pdf", [], verbose=False))
+        self.assertEqual(generator._gemini.calls, [])
+
+
+class JsonImportTest(_GeneratorTestCase):
+
+    def _write_json(self, name, data):
+        with open(name, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        return name
+
+    def test_duplicates_are_counted_but_not_added(self):
+        generator = self._generator()
+        card = {"question": "Was ist der Akkusativ von 'der'?", "answer": "den"}
+        path = self._write_json("cards.json", {"grammar": [card, card, {"question": "q", "answer": "a"}]})
+        result = generator.generate_from_json(path, verbose=False)
+        self.assertEqual(result["deck_counts"], {"Grammar": 3})
+        self.assertEqual(result["total_cards"], 3)
+        self.assertEqual(result["cards_added"], 2)
+        self.assertEqual(result["duplicates_skipped"], 1)
+
+    def test_parsed_file_cache_is_bounded(self):
+        generator = self._generator()
+        for i in range(generator_module._JSON_CACHE_MAX + 2):
+            path = self._write_json(f"cards{i}.json", {"grammar": [{"question": f"q{i}", "answer": "a"}]})
+            generator._load_and_validate_json(path)
+        self.assertEqual(len(generator_module._JSON_CACHE), generator_module._JSON_CACHE_MAX)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Tests for the local page classifier, on PDFs built with PyMuPDF."""
+
+import os
+import tempfile
+import unittest
+
+import fitz
+
+from gemini.pdf_processor import extract_pages_as_pdf, heuristic_classify
+
+_GERMAN = ("Vocabulary", "Grammar")
+
+
+def _pdf(*lines):
+    doc = fitz.open()
+    page = doc.new_page()
+    for i, line in enumerate(lines):
+        page.insert_text((72, 72 + 16 * i), line)
+    try:
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+class HeuristicClassifyTest(unittest.TestCase):
+
+    def test_word_list_is_vocabulary(self):
+        pdf = _pdf("der Hund - dog", "die Katze - cat", "das Haus - house",
+                   "der Baum - tree", "die Blume - flower", "das Auto = car")
+        self.assertEqual(heuristic_classify(pdf, _GERMAN), "vocabulary")
+
+    def test_example_sentences_are_not_vocabulary(self):
+        pdf = _pdf("Beispiel: Ich gehe nach Hause.", "Beispiel: Du gehst nach Hause.",
+                   "Beispiel: Er geht nach Hause.", "Beispiel: Wir gehen nach Hause.",
+                   "Beispiel: Ihr geht nach Hause.", "Beispiel: Sie gehen nach Hause.")
+        self.assertIsNone(heuristic_classify(pdf, _GERMAN))
+
+    def test_grammar_keywords_with_examples(self):
+        pdf = _pdf("Der Dativ", "Nach mit steht immer der Dativ.",
+                   "Beispiel: Ich fahre mit dem Bus.", "Akkusativ oder Dativ?",
+                   "Beispiel: Er hilft dem Mann.")
+        self.assertEqual(heuristic_classify(pdf, _GERMAN), "grammar")
+
+    def test_compound_keyword_counts_once(self):
+        pdf = _pdf("Das Plusquamperfekt", "Ich hatte gegessen.", "Du hattest gegessen.",
+                   "Er hatte gegessen.", "Plusquamperfekt mit sein")
+        self.assertIsNone(heuristic_classify(pdf, _GERMAN))
+
+    def test_mixed_page_is_ambiguous(self):
+        pdf = _pdf("der Hund - dog", "die Katze - cat", "das Haus - house",
+                   "Nach diesen Wörtern steht oft ein Artikel.",
+                   "Beispiel: Der Hund schläft.", "Beispiel: Die Katze spielt.")
+        self.assertIsNone(heuristic_classify(pdf, _GERMAN))
+
+    def test_too_little_text(self):
+        self.assertIsNone(heuristic_classify(_pdf("der Hund - dog"), _GERMAN))
+
+
+
+class ExtractPagesTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.path = os.path.join(self._tmp.name, "book.pdf")
+        doc = fitz.open()
+        for number in range(1, 4):
+            doc.new_page().insert_text((72, 72), f"Seite {number}")
+        doc.save(self.path)
+        doc.close()
+
+    def _page_texts(self, pdf_bytes):
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+            return [page.get_text().strip() for page in doc]
+
+    def test_ranges_from_the_same_source(self):
+        # The open source document is reused between calls and must stay whole
+        self.assertEqual(self._page_texts(extract_pages_as_pdf(self.path, 2, 3)), ["Seite 2", "Seite 3"])
+        self.assertEqual(self._page_texts(extract_pages_as_pdf(self.path, 1, 1)), ["Seite 1"])
+        self.assertEqual(len(self._page_texts(extract_pages_as_pdf(self.path, 1, 3))), 3)
+
+    def test_invalid_range(self):
+        with self.assertRaises(ValueError):
+            extract_pages_as_pdf(self.path, 3, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()